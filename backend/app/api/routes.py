@@ -1,19 +1,38 @@
 # backend/api/routes.py
-from fastapi import FastAPI, BackgroundTasks, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from app.services.job_manager import job_manager
 from app.services.repository_service import repository_service
+from app.db.database import db
 from app.models.job import AnalysisRequest, AnalysisJob
 from app.models.repository import Repository, RepositoryFilter
 from typing import List, Optional, Dict
 import os
 import stat
+import hashlib
+import mmap
 import time
+import asyncio
+import contextlib
+import functools
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
 import json
-import math
+import orjson
 from app.config import settings
 
-app = FastAPI(title="Repo-Analyzer API")
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the analysis workers with the server, and stop the pools and close SQLite connections with it."""
+    _prestart_analysis_workers(ANALYSIS_EXECUTOR)
+    yield
+    ANALYSIS_EXECUTOR.shutdown(wait=False)
+    DISCOVERY_EXECUTOR.shutdown(wait=False)
+    db.close_all()
+
+app = FastAPI(title="Repo-Analyzer API", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -24,38 +43,134 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Shared pool for the blocking directory scans behind /discover_repos
+DISCOVERY_EXECUTOR = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4), thread_name_prefix="discover")
+
+# Data files at least this large are parsed from a memory map rather than read into bytes
+JSON_MMAP_MIN_SIZE = 1024 * 1024
+
+# Analysis worker processes kept running; one per CPU unless configured
+ANALYSIS_WORKER_COUNT = settings.ANALYSIS_WORKERS or os.cpu_count() or 1
+
+def _init_analysis_worker():
+    """Open a new analysis worker's database connection so its first job doesn't pay for it."""
+    # Open this process's pooled connection (and run its PRAGMAs) ahead of the first job
+    with db.get_connection():
+        pass
+
+def _new_analysis_executor() -> ProcessPoolExecutor:
+    """Create the analysis worker pool; ProcessPoolExecutor only starts its processes as work is submitted."""
+    return ProcessPoolExecutor(max_workers=ANALYSIS_WORKER_COUNT, initializer=_init_analysis_worker)
+
+def _prestart_analysis_workers(executor: ProcessPoolExecutor):
+    """Make executor start all its worker processes now rather than on the first jobs.
+
+    The pool adds a process for each submission no idle worker can take, so one no-op per worker, submitted
+    before any has finished, starts every process (and runs its initializer) ahead of the first real job.
+    """
+    for _ in range(ANALYSIS_WORKER_COUNT):
+        executor.submit(os.getpid)
+
+# Long-lived worker processes for analysis jobs; replaced by _submit_analysis if a worker dies and breaks the pool
+ANALYSIS_EXECUTOR = _new_analysis_executor()
+_ANALYSIS_EXECUTOR_LOCK = threading.Lock()
+
+def _submit_analysis(fn, *args):
+    """Submit fn to the analysis pool, replacing the pool first if a dead worker has left it broken."""
+    global ANALYSIS_EXECUTOR
+    executor = ANALYSIS_EXECUTOR
+    try:
+        return executor.submit(fn, *args)
+    except BrokenProcessPool:
+        with _ANALYSIS_EXECUTOR_LOCK:
+            # Another request may already have replaced it
+            if ANALYSIS_EXECUTOR is executor:
+                ANALYSIS_EXECUTOR = _new_analysis_executor()
+                executor.shutdown(wait=False)
+            executor = ANALYSIS_EXECUTOR
+        return executor.submit(fn, *args)
+
+def _fail_job_if_worker_died(job_id: str, future):
+    """run_analysis_task records its own failures, so an exception here means the worker itself never finished the job."""
+    error = future.exception()
+    if error is not None:
+        job_manager.fail_job(job_id, f"Analysis worker failed: {error!r}")
+
+# Resolved once; expanduser re-reads HOME (or the pwd database) on every call
+_HOME = os.path.expanduser("~")
+
 # Helper function to expand home directory
 def expand_user_path(path: str) -> str:
     """Expand ~ to user's home directory"""
+    if path == '~':
+        return _HOME
+    if path.startswith('~/'):
+        return _HOME + path[1:]
     if path.startswith('~'):
-        return os.path.expanduser(path)
+        return os.path.expanduser(path)  # ~otheruser/...
     return path
 
+def _json_response(payload) -> Response:
+    """Serialize payload with orjson into a ready Response, so FastAPI's jsonable_encoder never walks it."""
+    return Response(content=orjson.dumps(payload), media_type="application/json")
+
+def _cacheable_json_response(request: Request, payload, max_age: int = 5) -> Response:
+    """Serialize payload with an ETag derived from its bytes, answering 304 when the client's copy still matches."""
+    body = orjson.dumps(payload)
+    etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={max_age}"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def _stream_report_file(report_path: str, chunk_size: int = 64 * 1024):
+    """Yield a report file wrapped in the {"content": ...} envelope without reading it all into memory.
+
+    This is a sync generator, so StreamingResponse iterates it in the threadpool rather than on the event loop.
+    """
+    yield '{"content": "'
+    with open(report_path, "r") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield json.dumps(chunk)[1:-1]  # Escape the chunk as a JSON string body
+    yield '"}'
+
 # Existing endpoints (unchanged)
 @app.post("/analyze", response_model=AnalysisJob)
-async def start_analysis(request: AnalysisRequest, background_tasks: BackgroundTasks):
+async def start_analysis(request: AnalysisRequest):
     """Start a repository analysis job."""
     expanded_repo_path = expand_user_path(request.repo_path)
     
-    if not os.path.exists(expanded_repo_path):
+    try:
+        os.stat(expanded_repo_path)
+    except (OSError, ValueError):
         raise HTTPException(status_code=400, detail=f"Repository path does not exist: {expanded_repo_path}")
     
     job = job_manager.create_job(expanded_repo_path, request.recursive, request.skip_confirmation, request.repo_id)
-    background_tasks.add_task(
-        job_manager.run_analysis_task,
-        job.id,
-        expanded_repo_path,
-        request.recursive,
-        request.skip_confirmation,
-        request.output_name,
-        request.repo_id
-    )
+    # Analyses shell out to git and crunch the results, so keep them out of the request-serving process
+    try:
+        future = _submit_analysis(
+            job_manager.run_analysis_task,
+            job.id,
+            expanded_repo_path,
+            request.recursive,
+            request.skip_confirmation,
+            request.output_name,
+            request.repo_id
+        )
+    except Exception as e:
+        # The job row already exists; don't leave it pending forever
+        job_manager.fail_job(job.id, f"Could not start analysis: {e!r}")
+        raise HTTPException(status_code=503, detail="Analysis workers are unavailable")
+    future.add_done_callback(functools.partial(_fail_job_if_worker_died, job.id))
     return job
 
-@app.get("/jobs", response_model=List[AnalysisJob])
+@app.get("/jobs")
 async def list_jobs():
     """List all analysis jobs."""
-    return job_manager.get_all_jobs()
+    return _json_response(job_manager.get_all_job_dicts())
 
 @app.get("/jobs/{job_id}", response_model=AnalysisJob)
 async def get_job(job_id: str):
@@ -79,12 +194,10 @@ async def get_report(job_id: str):
         
         if report_content:
             # Return report from database
-            return {"content": report_content}
+            return _json_response({"content": report_content})
         elif job.report_path and os.path.exists(job.report_path):
             # Fall back to file system for backward compatibility
-            with open(job.report_path, "r") as f:
-                report_content = f.read()
-            return {"content": report_content}
+            return StreamingResponse(_stream_report_file(job.report_path), media_type="application/json")
         else:
             raise HTTPException(status_code=404, detail="Report not found")
     except Exception as e:
@@ -102,69 +215,69 @@ async def get_data(job_id: str):
         if job.status != "completed":
             raise HTTPException(status_code=400, detail="Job is not completed")
         
-        # Try to get data from database first
-        data = job_manager.get_job_data(job_id)
+        # Try to get data from database first; it is stored as sanitized JSON, so send it verbatim
+        data_json = job_manager.get_job_data_json(job_id)
         
-        if data:
+        if data_json:
             # Return data from database
-            return data
+            return Response(content=data_json, media_type="application/json")
         else:
             # Fall back to file system for backward compatibility
             data_path = os.path.join(settings.REPORTS_DIR, job_id, "repo_data.json")
             if not os.path.exists(data_path):
                 raise HTTPException(status_code=404, detail="Data file not found")
             
-            with open(data_path, "r") as f:
-                # Sanitize the data to handle any inf/nan values
-                def sanitize_json(obj):
-                    if isinstance(obj, dict):
-                        return {k: sanitize_json(v) for k, v in obj.items()}
-                    elif isinstance(obj, list):
-                        return [sanitize_json(item) for item in obj]
-                    elif isinstance(obj, float) and (math.isinf(obj) or math.isnan(obj)):
-                        # Replace infinity and NaN with null
-                        return None
-                    else:
-                        return obj
-                        
-                try:
-                    data = json.load(f)
-                    # Sanitize the data
-                    sanitized_data = sanitize_json(data)
-                    return sanitized_data
-                except json.JSONDecodeError:
-                    raise HTTPException(status_code=500, detail="Error decoding JSON data")
+            try:
+                return _json_response(_load_json_file(data_path))
+            except json.JSONDecodeError:
+                raise HTTPException(status_code=500, detail="Error decoding JSON data")
     except Exception as e:
         if isinstance(e, HTTPException):
             raise e
         raise HTTPException(status_code=404, detail=str(e))
         
-@app.get("/browse_directory")
-async def browse_directory(directory: str):
-    """Browse a directory and return its contents."""
-    expanded_dir = expand_user_path(directory)
-    
-    if not expanded_dir:
-        expanded_dir = os.path.expanduser("~")
-    
-    if not os.path.exists(expanded_dir):
+def _loads_json(raw) -> object:
+    """Parse JSON bytes with orjson, accepting the NaN/Infinity literals json.dump may have written."""
+    # orjson writes NaN/Infinity back out as null, so the data needs no sanitizing pass
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        # orjson rejects those literals; only such files pay for the stdlib parser
+        return json.loads(bytes(raw))
+
+def _load_json_file(path: str) -> object:
+    """Parse a JSON file, memory-mapping large ones so orjson reads the page cache without an intermediate copy."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < JSON_MMAP_MIN_SIZE:
+            return _loads_json(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return _loads_json(view)
+
+def _browse_directory_sync(expanded_dir: str) -> Dict:
+    """List a directory's contents; runs off the event loop since every entry costs a stat."""
+    # One stat answers both "does it exist" and "is it a directory"; like os.path.exists, any failure
+    # (permission denied, an embedded NUL byte, ...) counts as "does not exist"
+    try:
+        st = os.stat(expanded_dir)
+    except (OSError, ValueError):
         raise HTTPException(status_code=400, detail=f"Directory does not exist: {expanded_dir}")
-    if not os.path.isdir(expanded_dir):
+    if not stat.S_ISDIR(st.st_mode):
         raise HTTPException(status_code=400, detail=f"Path is not a directory: {expanded_dir}")
 
     contents = []
     try:
-        for item in os.listdir(expanded_dir):
-            item_path = os.path.join(expanded_dir, item)
-            stats = os.stat(item_path)
-            item_type = "directory" if stat.S_ISDIR(stats.st_mode) else "file"
-            contents.append({
-                "name": item,
-                "path": item_path,
-                "type": item_type,
-                "size": stats.st_size if item_type == "file" else None,
-                "modified": int(stats.st_mtime * 1000)  # Convert to milliseconds
-            })
+        # scandir yields DirEntry objects whose type comes from the directory read itself
+        with os.scandir(expanded_dir) as it:
+            for entry in it:
+                is_dir = entry.is_dir()
+                stats = entry.stat()
+                contents.append({
+                    "name": entry.name,
+                    "path": entry.path,
+                    "type": "directory" if is_dir else "file",
+                    "size": None if is_dir else stats.st_size,
+                    "modified": int(stats.st_mtime * 1000)  # Convert to milliseconds
+                })
     except PermissionError:
         raise HTTPException(status_code=403, detail=f"Permission denied: Cannot access {expanded_dir}")
 
@@ -178,44 +291,88 @@ async def browse_directory(directory: str):
         "contents": contents
     }
 
+@app.get("/browse_directory")
+async def browse_directory(directory: str, request: Request):
+    """Browse a directory and return its contents."""
+    expanded_dir = expand_user_path(directory)
+    
+    if not expanded_dir:
+        expanded_dir = _HOME
+
+    return _cacheable_json_response(request, await asyncio.to_thread(_browse_directory_sync, expanded_dir))
+
+def _has_git_dir(path: str) -> bool:
+    """Whether path contains a .git directory, at the cost of a single stat."""
+    try:
+        return stat.S_ISDIR(os.stat(os.path.join(path, ".git")).st_mode)
+    except OSError:
+        return False
+
+def _scan_for_repos(current_dir: str, current_depth: int, base_dir: str, depth: int):
+    """Scan one directory level, returning (repositories found, subdirectories to scan next).
+
+    Subdirectories that will be scanned anyway recognise themselves as repositories from the .git entry in
+    their own listing, so only the deepest level pays an extra stat per directory.
+    """
+    found = []
+    children = []
+    try:
+        with os.scandir(current_dir) as it:
+            for entry in it:
+                if current_depth > 0 and entry.name == ".git" and entry.is_dir():
+                    # current_dir is itself a repository; report it and don't descend
+                    return [{
+                        "name": os.path.basename(current_dir),
+                        "path": current_dir,
+                        "relative_path": os.path.relpath(current_dir, base_dir)
+                    }], []
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                if current_depth < depth:
+                    children.append((entry.path, current_depth + 1))
+                elif _has_git_dir(entry.path):
+                    found.append({
+                        "name": entry.name,
+                        "path": entry.path,
+                        "relative_path": os.path.relpath(entry.path, base_dir)
+                    })
+    except OSError:
+        pass  # Skip directories we can't read (permission denied, removed mid-scan, ...)
+    return found, children
+
+def _discover_repos_sync(base_dir: str, depth: int) -> List[Dict]:
+    """Fan directory scans out over a thread pool so several readdirs are in flight at once."""
+    try:
+        st = os.stat(base_dir)
+    except (OSError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Base directory does not exist: {base_dir}")
+    if not stat.S_ISDIR(st.st_mode):
+        raise HTTPException(status_code=400, detail=f"Path is not a directory: {base_dir}")
+
+    repositories = []
+    pending = {DISCOVERY_EXECUTOR.submit(_scan_for_repos, base_dir, 0, base_dir, depth)}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            found, children = future.result()
+            repositories.extend(found)
+            for child_dir, child_depth in children:
+                pending.add(DISCOVERY_EXECUTOR.submit(_scan_for_repos, child_dir, child_depth, base_dir, depth))
+    return repositories
+
 @app.get("/discover_repos")
 async def discover_repos(base_dir: str, depth: int = 2):
     """Discover Git repositories in the base directory up to a specified depth."""
     expanded_dir = expand_user_path(base_dir)
     
     if not expanded_dir:
-        expanded_dir = os.path.expanduser("~")
-        
-    if not os.path.exists(expanded_dir):
-        raise HTTPException(status_code=400, detail=f"Base directory does not exist: {expanded_dir}")
-    if not os.path.isdir(expanded_dir):
-        raise HTTPException(status_code=400, detail=f"Path is not a directory: {expanded_dir}")
+        expanded_dir = _HOME
 
-    repositories = []
-    def scan_directory(current_dir: str, current_depth: int):
-        if current_depth > depth:
-            return
-        try:
-            for item in os.listdir(current_dir):
-                item_path = os.path.join(current_dir, item)
-                if os.path.isdir(item_path):
-                    git_path = os.path.join(item_path, ".git")
-                    if os.path.isdir(git_path):
-                        repositories.append({
-                            "name": item,
-                            "path": item_path,
-                            "relative_path": os.path.relpath(item_path, expanded_dir)
-                        })
-                    else:
-                        scan_directory(item_path, current_depth + 1)
-        except PermissionError:
-            pass  # Skip directories we don't have permission to access
-    
-    scan_directory(expanded_dir, 0)
-    return repositories
+    # The coordinator blocks on futures, so it runs outside DISCOVERY_EXECUTOR to avoid starving the scans
+    return await asyncio.to_thread(_discover_repos_sync, expanded_dir, depth)
 
 # New Repository CRUD Endpoints
-@app.get("/repositories", response_model=List[Repository])
+@app.get("/repositories")
 async def list_repositories(
     search: Optional[str] = None,
     is_favorite: Optional[bool] = None,
@@ -238,8 +395,25 @@ async def list_repositories(
         sort_order=sort_order
     )
     
-    return repository_service.find_repositories(repo_filter)
+    # The dicts carry stored metadata as orjson.Fragment, which only orjson can serialize
+    return _json_response(repository_service.find_repository_dicts(repo_filter))
+
+
+# Declared before /repositories/{repo_id} so "tags" and "search" aren't captured as repository IDs
+@app.get("/repositories/tags")
+async def get_repository_tags(request: Request):
+    """Get all repository tags."""
+    return _cacheable_json_response(request, repository_service.get_all_tags())
 
+@app.get("/repositories/search")
+async def search_repositories(
+    query: str = Query(..., description="Search query for repository name, path, or tags"),
+    limit: int = Query(10, description="Maximum number of results")
+):
+    """Search repositories by name, path, or tags."""
+    repo_filter = RepositoryFilter(search=query)
+    results = repository_service.find_repository_dicts(repo_filter)
+    return _json_response(results[:limit])
 
 @app.get("/repositories/{repo_id}", response_model=Repository)
 async def get_repository(repo_id: str):
@@ -278,11 +452,6 @@ async def delete_repository(repo_id: str):
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
-@app.get("/repositories/tags")
-async def get_repository_tags():
-    """Get all repository tags."""
-    return repository_service.get_all_tags()
-
 @app.post("/repositories/{repo_id}/favorite", response_model=Repository)
 async def toggle_favorite(repo_id: str, is_favorite: bool):
     """Toggle favorite status for a repository."""
@@ -296,14 +465,3 @@ async def batch_update_repositories(updates: List[Dict]):
     """Update multiple repositories in a single request."""
     updated_count = repository_service.update_repositories_metadata(updates)
     return {"updated": updated_count}
-
-# Add repository search endpoint
-@app.get("/repositories/search", response_model=List[Repository])
-async def search_repositories(
-    query: str = Query(..., description="Search query for repository name, path, or tags"),
-    limit: int = Query(10, description="Maximum number of results")
-):
-    """Search repositories by name, path, or tags."""
-    repo_filter = RepositoryFilter(search=query)
-    results = repository_service.find_repositories(repo_filter)
-    return results[:limit]
\ No newline at end of file
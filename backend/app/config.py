@@ -8,6 +8,16 @@ class Settings(BaseSettings):
     REPO_ANALYZER_PATH: str = "./repo_analyzer.py"
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
+    # Number of analysis worker processes; 0 uses one per CPU
+    ANALYSIS_WORKERS: int = 0
+    # Repositories analyzed at once within one (recursive) analysis job; 0 uses one per CPU
+    ANALYSIS_REPO_WORKERS: int = 0
+    # Git history cache reused while a repository's refs are unchanged; empty disables it
+    ANALYSIS_CACHE_DIR: str = "./reports/.cache"
+    # Analyze only this many of each repository's most recent commits; 0 analyzes the full history
+    ANALYSIS_MAX_COMMITS: int = 0
+    # Analyze only commits after this date (anything git log --since accepts, e.g. "1 year ago"); empty analyzes all
+    ANALYSIS_SINCE: str = ""
 
     class Config:
         env_file = ".env"
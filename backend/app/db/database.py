@@ -1,107 +1,315 @@
 # backend/db/database.py
+import atexit
+import os
 import sqlite3
+import threading
 from contextlib import contextmanager
 from app.config import settings
 
+# Bump when the DDL below changes; PRAGMA user_version records what a database file already has
+SCHEMA_VERSION = 10
+
+def _split_tags_sql(column: str) -> str:
+    """SQL turning a comma-separated tags column into a JSON array of strings for json_each.
+
+    json_quote escapes quotes, backslashes and control characters, and never escapes a comma, so splitting
+    the quoted string on commas always leaves valid JSON (triggers can't split with a recursive CTE instead).
+    """
+    return f"""'[' || replace(json_quote(coalesce({column}, '')), ',', '","') || ']'"""
+
 class Database:
     def __init__(self):
         self.db_path = settings.DATABASE_URL.replace("sqlite:///", "")
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        # A forked worker must not share its parent's SQLite handles
+        os.register_at_fork(after_in_child=self._reset_pool)
+        # Close pooled connections at interpreter exit too (CLI runs, servers stopped without the shutdown event)
+        atexit.register(self.close_all)
         self._init_db()
-        self.ensure_job_storage_tables()
 
     def _init_db(self):
-        """Initialize the database with enhanced schema."""
+        """Initialize the database schema, skipping the DDL entirely when it is already current."""
         with self.get_connection() as conn:
-            # Create repositories table first (since jobs will reference it)
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS repositories (
-                    id TEXT PRIMARY KEY,
-                    name TEXT NOT NULL,
-                    path TEXT NOT NULL UNIQUE,
-                    relative_path TEXT NOT NULL,
-                    is_favorite INTEGER DEFAULT 0,
-                    last_accessed TEXT,
-                    tags TEXT,
-                    last_commit_date TEXT,
-                    last_analysis_job_id TEXT,
-                    metadata TEXT
-                )
-            """)
-            
-            # Create jobs table with repo_id foreign key
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS jobs (
-                    id TEXT PRIMARY KEY,
-                    status TEXT NOT NULL,
-                    created_at TEXT NOT NULL,
-                    completed_at TEXT,
-                    repo_path TEXT NOT NULL,
-                    report_path TEXT,
-                    error TEXT,
-                    repo_id TEXT,
-                    FOREIGN KEY (repo_id) REFERENCES repositories(id)
-                )
-            """)
-            
-            # Add foreign key from repositories to jobs for last_analysis_job_id
-            # This is a separate step to handle circular reference
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                self._migrate(conn)
+            # The full-text index is optional: SQLite builds without FTS5 fall back to LIKE searches
+            self.fts_enabled = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'repositories_fts'"
+            ).fetchone() is not None
+
+    def _migrate(self, conn):
+        """Bring the schema up to SCHEMA_VERSION in a single transaction."""
+        conn.execute("BEGIN IMMEDIATE")
+        # Re-check under the write lock in case another process migrated first
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            self._create_core_tables(conn)
+            self._create_job_storage_tables(conn)
+        if version < 2:
+            # job_id is already the primary key of both tables, so these only cost extra writes
+            conn.execute("DROP INDEX IF EXISTS idx_job_reports_job_id")
+            conn.execute("DROP INDEX IF EXISTS idx_job_data_job_id")
+        if version < 3:
+            self._create_search_index(conn)
+        if version < 4:
+            self._create_tag_table(conn)
+        if version < 5:
+            self._create_sort_indexes(conn)
+        if version < 6:
+            # Fingerprint of analysis_data, letting re-saves of identical data skip the write
+            conn.execute("ALTER TABLE job_data ADD COLUMN data_hash INTEGER")
+        if version < 7:
+            # Repositories used to be inserted without an id; give those rows a stable one
             conn.execute("""
-                CREATE TABLE IF NOT EXISTS repository_job_links (
-                    repository_id TEXT,
-                    job_id TEXT,
-                    PRIMARY KEY (repository_id, job_id),
-                    FOREIGN KEY (repository_id) REFERENCES repositories(id),
-                    FOREIGN KEY (job_id) REFERENCES jobs(id)
-                )
+                UPDATE repositories SET id = lower(hex(randomblob(16)))
+                WHERE id IS NULL
             """)
-            
-            # Add indexes for performance
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_repos_favorite ON repositories(is_favorite)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_repos_last_accessed ON repositories(last_accessed)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_repo_id ON jobs(repo_id)")
-            
-            conn.commit()
-
-        # Add this method to the Database class in app/db/database.py
-
-    def ensure_job_storage_tables(self):
+        if version < 8:
+            # Older triggers dropped every tag of a repository whose tags held a control character
+            for trigger in ("repository_tags_insert", "repository_tags_update", "repository_tags_delete"):
+                conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            conn.execute("DELETE FROM repository_tags")
+            self._create_tag_table(conn)
+        if version < 9:
+            # Tag filters match regardless of ASCII case, as the LIKE filter they replaced did
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_repository_tags_tag_nocase ON repository_tags(tag COLLATE NOCASE)")
+        if version < 10:
+            self._add_repository_row_key(conn)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.commit()
+
+    def _create_core_tables(self, conn):
+        """Create the repositories and jobs tables."""
+        # Create repositories table first (since jobs will reference it)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS repositories (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                path TEXT NOT NULL UNIQUE,
+                relative_path TEXT NOT NULL,
+                is_favorite INTEGER DEFAULT 0,
+                last_accessed TEXT,
+                tags TEXT,
+                last_commit_date TEXT,
+                last_analysis_job_id TEXT,
+                metadata TEXT
+            )
+        """)
+        
+        # Create jobs table with repo_id foreign key
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                completed_at TEXT,
+                repo_path TEXT NOT NULL,
+                report_path TEXT,
+                error TEXT,
+                repo_id TEXT,
+                FOREIGN KEY (repo_id) REFERENCES repositories(id)
+            )
+        """)
+        
+        # Add foreign key from repositories to jobs for last_analysis_job_id
+        # This is a separate step to handle circular reference
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS repository_job_links (
+                repository_id TEXT,
+                job_id TEXT,
+                PRIMARY KEY (repository_id, job_id),
+                FOREIGN KEY (repository_id) REFERENCES repositories(id),
+                FOREIGN KEY (job_id) REFERENCES jobs(id)
+            )
+        """)
+        
+        # Add indexes for performance
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_repos_favorite ON repositories(is_favorite)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_repos_last_accessed ON repositories(last_accessed)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_repo_id ON jobs(repo_id)")
+
+    def _create_job_storage_tables(self, conn):
         """Create tables for storing job report content and analysis data."""
-        with self.get_connection() as conn:
-            # Create table for job reports
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS job_reports (
-                    job_id TEXT PRIMARY KEY,
-                    report_content TEXT NOT NULL,
-                    created_at TEXT NOT NULL,
-                    FOREIGN KEY (job_id) REFERENCES jobs(id)
-                )
-            """)
-            
-            # Create table for job data
+        # Create table for job reports
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_reports (
+                job_id TEXT PRIMARY KEY,
+                report_content TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                FOREIGN KEY (job_id) REFERENCES jobs(id)
+            )
+        """)
+        
+        # Create table for job data
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_data (
+                job_id TEXT PRIMARY KEY,
+                analysis_data TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                FOREIGN KEY (job_id) REFERENCES jobs(id)
+            )
+        """)
+
+    def _create_search_index(self, conn):
+        """Create a trigram FTS5 index over repository name, path and tags, kept in sync by triggers."""
+        try:
+            # Trigram tokens keep the substring semantics of the LIKE '%term%' search they replace
             conn.execute("""
-                CREATE TABLE IF NOT EXISTS job_data (
-                    job_id TEXT PRIMARY KEY,
-                    analysis_data TEXT NOT NULL,
-                    created_at TEXT NOT NULL,
-                    FOREIGN KEY (job_id) REFERENCES jobs(id)
+                CREATE VIRTUAL TABLE IF NOT EXISTS repositories_fts USING fts5(
+                    name, path, tags,
+                    content='repositories', content_rowid='rowid', tokenize='trigram'
                 )
             """)
-            
-            # Add indexes
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_job_reports_job_id ON job_reports(job_id)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_job_data_job_id ON job_data(job_id)")
-            
-            conn.commit()
+        except sqlite3.OperationalError:
+            return  # FTS5 (or its trigram tokenizer) isn't compiled into this SQLite
+        
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS repositories_fts_insert AFTER INSERT ON repositories BEGIN
+                INSERT INTO repositories_fts (rowid, name, path, tags) VALUES (new.rowid, new.name, new.path, new.tags);
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS repositories_fts_delete AFTER DELETE ON repositories BEGIN
+                INSERT INTO repositories_fts (repositories_fts, rowid, name, path, tags)
+                VALUES ('delete', old.rowid, old.name, old.path, old.tags);
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS repositories_fts_update AFTER UPDATE OF name, path, tags ON repositories BEGIN
+                INSERT INTO repositories_fts (repositories_fts, rowid, name, path, tags)
+                VALUES ('delete', old.rowid, old.name, old.path, old.tags);
+                INSERT INTO repositories_fts (rowid, name, path, tags) VALUES (new.rowid, new.name, new.path, new.tags);
+            END
+        """)
+        
+        # Index the rows that existed before the search index did
+        conn.execute("INSERT INTO repositories_fts (repositories_fts) VALUES ('rebuild')")
+
+    def _create_sort_indexes(self, conn):
+        """Index the repository list's sort keys so ORDER BY walks an index instead of sorting the table."""
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_repos_name ON repositories(name)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_repos_last_commit_date ON repositories(last_commit_date)")
+        # Favorites are listed by recency, so one index serves both the filter and the default order
+        conn.execute("DROP INDEX IF EXISTS idx_repos_favorite")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_repos_favorite_last_accessed ON repositories(is_favorite, last_accessed)")
+
+    def _create_tag_table(self, conn):
+        """Create repository_tags, one row per tag, maintained from repositories.tags by triggers."""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS repository_tags (
+                repository_rowid INTEGER NOT NULL,
+                tag TEXT NOT NULL,
+                PRIMARY KEY (repository_rowid, tag)
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_repository_tags_tag ON repository_tags(tag)")
+        
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS repository_tags_insert AFTER INSERT ON repositories BEGIN
+                INSERT OR IGNORE INTO repository_tags (repository_rowid, tag)
+                SELECT new.rowid, trim(value) FROM json_each({_split_tags_sql("new.tags")}) WHERE trim(value) != '';
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS repository_tags_update AFTER UPDATE OF tags ON repositories BEGIN
+                DELETE FROM repository_tags WHERE repository_rowid = old.rowid;
+                INSERT OR IGNORE INTO repository_tags (repository_rowid, tag)
+                SELECT new.rowid, trim(value) FROM json_each({_split_tags_sql("new.tags")}) WHERE trim(value) != '';
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS repository_tags_delete AFTER DELETE ON repositories BEGIN
+                DELETE FROM repository_tags WHERE repository_rowid = old.rowid;
+            END
+        """)
+        
+        # Split the tags of rows that predate the table
+        conn.execute(f"""
+            INSERT OR IGNORE INTO repository_tags (repository_rowid, tag)
+            SELECT r.rowid, trim(t.value) FROM repositories r, json_each({_split_tags_sql("r.tags")}) t
+            WHERE trim(t.value) != ''
+        """)
+
+    def _add_repository_row_key(self, conn):
+        """Rebuild repositories with an explicit INTEGER PRIMARY KEY so its rowids survive VACUUM.
+
+        repository_tags and the full-text index refer to repositories by rowid, which VACUUM may renumber
+        in a table without one. Existing rowids are copied into the new key, so those references stay valid.
+        """
+        conn.execute("""
+            CREATE TABLE repositories_new (
+                seq INTEGER PRIMARY KEY,
+                id TEXT NOT NULL UNIQUE,
+                name TEXT NOT NULL,
+                path TEXT NOT NULL UNIQUE,
+                relative_path TEXT NOT NULL,
+                is_favorite INTEGER DEFAULT 0,
+                last_accessed TEXT,
+                tags TEXT,
+                last_commit_date TEXT,
+                last_analysis_job_id TEXT,
+                metadata TEXT
+            )
+        """)
+        conn.execute("""
+            INSERT INTO repositories_new (seq, id, name, path, relative_path, is_favorite, last_accessed, tags,
+                                          last_commit_date, last_analysis_job_id, metadata)
+            SELECT rowid, id, name, path, relative_path, is_favorite, last_accessed, tags,
+                   last_commit_date, last_analysis_job_id, metadata
+            FROM repositories
+        """)
+        # Dropping the old table drops its indexes and triggers too; they are recreated on the new one below
+        conn.execute("DROP TABLE repositories")
+        conn.execute("ALTER TABLE repositories_new RENAME TO repositories")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_repos_last_accessed ON repositories(last_accessed)")
+        self._create_sort_indexes(conn)
+        self._create_tag_table(conn)
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'repositories_fts'").fetchone():
+            self._create_search_index(conn)
+
+    def _connect(self):
+        """Open a long-lived connection tuned for concurrent readers alongside a writer."""
+        # A larger statement cache keeps every find_repositories query shape compiled
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None, cached_statements=256)
+        conn.row_factory = sqlite3.Row  # Return rows as dict-like objects
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-65536")
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
 
     @contextmanager
     def get_connection(self):
-        """Provide a database connection with context management."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Return rows as dict-like objects
+        """Provide this thread's pooled database connection with context management."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
         try:
             yield conn
-        finally:
-            conn.close()
+        except Exception:
+            # Don't leave a half-finished transaction on a connection that outlives this block
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+
+    def _reset_pool(self):
+        """Forget inherited connections without closing them; they still belong to the parent."""
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+
+    def close_all(self):
+        """Close every pooled connection, e.g. on application shutdown."""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
 
 db = Database()
\ No newline at end of file
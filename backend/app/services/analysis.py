@@ -1,6 +1,7 @@
 # backend/services/analysis.py 
 import os
-import subprocess
+import functools
+import shutil
 from datetime import datetime
 from app.config import settings
 from .simplified_repo_analyzer import run_analysis
@@ -22,7 +23,11 @@ class AnalysisService:
                 recursive=recursive,
                 skip_confirmation=skip_confirmation,
                 job_id=job_id,
-                repo_id=repo_id
+                repo_id=repo_id,
+                max_workers=settings.ANALYSIS_REPO_WORKERS or None,
+                cache_dir=settings.ANALYSIS_CACHE_DIR or None,
+                max_commits=settings.ANALYSIS_MAX_COMMITS or None,
+                since=settings.ANALYSIS_SINCE or None
             )
             
             if not report_path:
@@ -33,20 +38,17 @@ class AnalysisService:
         except Exception as e:
             raise Exception(f"Analysis failed: {str(e)}")
     
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _git_available() -> bool:
+        """Look git up on PATH once per process; the answer doesn't change while the server runs."""
+        # A PATH lookup answers "is git installed" without forking a git process
+        return shutil.which('git') is not None
+    
     def check_requirements(self):
-        """Check if Git and required packages are available."""
-        # Check if git is available
-        try:
-            subprocess.run(['git', '--version'], capture_output=True, check=True)
-        except (FileNotFoundError, subprocess.SubprocessError):
+        """Check if Git is available."""
+        # The analyzer otherwise only uses the standard library, so there are no packages to check
+        if not self._git_available():
             raise FileNotFoundError("Git command not found. Please install Git.")
-        
-        # Check for essential Python packages
-        required_packages = ["datetime", "json", "collections", "re"]
-        for package in required_packages:
-            try:
-                __import__(package)
-            except ImportError:
-                raise ImportError(f"Required package '{package}' is missing.")
 
 analysis_service = AnalysisService()
\ No newline at end of file
@@ -1,19 +1,62 @@
 # backend/services/job_manager.py
 import uuid
 import os
-import json
-import math
+import hashlib
+import shutil
+import orjson
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Union
 from app.db.database import db
 from app.models.job import AnalysisJob
 from app.services.analysis import analysis_service
 from app.config import settings
 
+# Chunk size for copying report files into the database
+REPORT_COPY_CHUNK_SIZE = 1024 * 1024
+
+UPDATE_JOB_SQL = """
+    UPDATE jobs
+    SET status = ?, completed_at = ?, report_path = ?, error = ?
+    WHERE id = ?
+"""
+
+# job_id is the primary key of both storage tables, so re-saving a job overwrites its row in one statement.
+# Job data is only rewritten when its fingerprint differs from the stored one.
+UPSERT_JOB_DATA_SQL = """
+    INSERT INTO job_data (job_id, analysis_data, data_hash, created_at)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(job_id) DO UPDATE
+        SET analysis_data = excluded.analysis_data, data_hash = excluded.data_hash, created_at = excluded.created_at
+        WHERE data_hash IS NOT excluded.data_hash
+"""
+
+UPSERT_JOB_REPORT_SQL = """
+    INSERT INTO job_reports (job_id, report_content, created_at)
+    VALUES (?, ?, ?)
+    ON CONFLICT(job_id) DO UPDATE SET report_content = excluded.report_content, created_at = excluded.created_at
+"""
+
+# Sizes the report row for incremental blob I/O and hands back its rowid for blobopen()
+UPSERT_JOB_REPORT_BLOB_SQL = """
+    INSERT INTO job_reports (job_id, report_content, created_at)
+    VALUES (?, zeroblob(?), ?)
+    ON CONFLICT(job_id) DO UPDATE SET report_content = excluded.report_content, created_at = excluded.created_at
+    RETURNING rowid
+"""
+
+# Summary counts copied from an analysis result into the repository's metadata
+SUMMARY_FIELDS = ("num_commits", "num_branches", "file_count", "total_lines", "contributor_count")
+
+def _build_summary(summary: dict, job_id: str, date: str) -> dict:
+    """Build the analysis_summary stored in repository metadata from an analysis result's summary."""
+    analysis_summary = {"date": date, "job_id": job_id}
+    analysis_summary.update((field, summary.get(field, 0)) for field in SUMMARY_FIELDS)
+    return analysis_summary
+
 class JobManager:
     def create_job(self, repo_path: str, recursive: bool = True, skip_confirmation: bool = True, repo_id: Optional[str] = None) -> AnalysisJob:
         """Create a new job and store it in the database."""
-        job_id = str(uuid.uuid4())
+        job_id = uuid.uuid4().hex  # Same entropy as the hyphenated form in 32 characters
         job = AnalysisJob(
             id=job_id,
             status="pending",
@@ -42,15 +85,29 @@ class JobManager:
             cursor = conn.execute("SELECT * FROM jobs ORDER BY created_at DESC")
             return [AnalysisJob.from_db_row(row) for row in cursor.fetchall()]
 
+    def get_all_job_dicts(self) -> List[dict]:
+        """Get all jobs as plain dicts for the list response, skipping per-row AnalysisJob validation."""
+        with db.get_connection() as conn:
+            cursor = conn.execute("""
+                SELECT id, status, created_at, completed_at, repo_path, report_path, error, repo_id
+                FROM jobs ORDER BY created_at DESC
+            """)
+            return [dict(row) for row in cursor.fetchall()]
+
     def update_job(self, job: AnalysisJob):
         with db.get_connection() as conn:
-            conn.execute("""
-                UPDATE jobs
-                SET status = ?, completed_at = ?, report_path = ?, error = ?
-                WHERE id = ?
-            """, (job.status, job.completed_at, job.report_path, job.error, job.id))
+            conn.execute(UPDATE_JOB_SQL, (job.status, job.completed_at, job.report_path, job.error, job.id))
             conn.commit()
     
+    def fail_job(self, job_id: str, error: str) -> AnalysisJob:
+        """Mark a job as failed with the given error."""
+        job = self.get_job(job_id)
+        job.status = "failed"
+        job.completed_at = datetime.now().isoformat()
+        job.error = error
+        self.update_job(job)
+        return job
+
     def run_analysis_task(self, job_id: str, repo_path: str, recursive: bool = True, 
                         skip_confirmation: bool = True, output_name: Optional[str] = None, repo_id: Optional[str] = None):
         """Run an analysis job and update the database with results."""
@@ -82,68 +139,51 @@ class JobManager:
             
             # We have the results dict now, which contains all repository data
             # Let's find the first repo or a specific one if we're looking for a single repo
+            job_data = None
+            stored_report_path = None
+            # Looked up once; results can hold hundreds of repositories in recursive mode
+            first_result = results[next(iter(results))] if results else None
             if results:
                 # For single repository analysis
                 if repo_id and len(results) == 1:
-                    repo_name = list(results.keys())[0]
-                    repo_data = results[repo_name]['data']
-                    report_path = results[repo_name]['report_files']['markdown']
-                    
-                    # Save data to database
-                    self.save_job_data(job_id, repo_data)
-                    
-                    # Save report to database
-                    with open(report_path, "r") as f:
-                        report_content = f.read()
-                    self.save_job_report(job_id, report_content)
+                    job_data = first_result['data']
+                    report_path = first_result['report_files']['markdown']
+                    stored_report_path = report_path
                 else:
                     # For multiple repositories, use the first one's report or aggregate
-                    first_repo = list(results.keys())[0]
-                    report_path = results[first_repo]['report_files']['markdown']
-                    
-                    # Save full results data to database
-                    self.save_job_data(job_id, results)
+                    report_path = first_result['report_files']['markdown']
+                    job_data = results
             else:
                 report_path = None
             
-            # Update job in database
             job.status = "completed"
-            job.completed_at = datetime.now().isoformat()
+            job.completed_at = datetime.now().isoformat()  # Also the created_at of the stored data and report
             job.report_path = report_path  # Keep for backward compatibility
-            self.update_job(job)
+            
+            # Data, report and completed status land in one transaction, so a job is never "completed" without its results
+            with db.get_connection() as conn:
+                conn.execute("BEGIN")
+                if job_data is not None:
+                    self._write_job_data(conn, job_id, job_data, job.completed_at)
+                if stored_report_path:
+                    self._write_job_report_file(conn, job_id, stored_report_path, job.completed_at)
+                conn.execute(UPDATE_JOB_SQL, (job.status, job.completed_at, job.report_path, job.error, job.id))
+                conn.commit()
             
             # If repo_id provided, update the repository with analysis results
             if repo_id and results:
                 try:
-                    # Get repository from database
-                    repo = repository_service.get_repository(repo_id)
-                    
-                    # Initialize metadata if not present
-                    if not repo.metadata:
-                        repo.metadata = {}
-                    
                     # Get the repository data
-                    repo_name = list(results.keys())[0]
-                    repo_data = results[repo_name]['data']
-                    
-                    # Update repository metadata with analysis summary
-                    repo.metadata["analysis_summary"] = {
-                        "date": job.completed_at,
-                        "job_id": job_id,
-                        "num_commits": repo_data["summary"].get("num_commits", 0),
-                        "num_branches": repo_data["summary"].get("num_branches", 0),
-                        "file_count": repo_data["summary"].get("file_count", 0),
-                        "total_lines": repo_data["summary"].get("total_lines", 0),
-                        "contributor_count": repo_data["summary"].get("contributor_count", 0)
-                    }
+                    repo_data = first_result['data']
                     
-                    # Update last commit date if available
-                    if "last_commit" in repo_data["summary"]:
-                        repo.last_commit_date = repo_data["summary"]["last_commit"]
-                    
-                    # Update last_analysis_job_id and save to database
-                    repo.last_analysis_job_id = job_id
-                    repository_service.update_repository(repo_id, repo)
+                    # Write only the analysis fields in place; a read-modify-write of the whole row here
+                    # would overwrite edits (tags, favorite, name) made in the API process meanwhile
+                    repository_service.record_analysis(
+                        repo_id,
+                        job_id,
+                        _build_summary(repo_data["summary"], job_id, job.completed_at),
+                        repo_data["summary"].get("last_commit")
+                    )
                     print(f"Updated repository metadata for {repo_id}")
                     
                 except Exception as repo_error:
@@ -152,11 +192,7 @@ class JobManager:
                     
         except Exception as e:
             # Update job with error information
-            job = self.get_job(job_id)
-            job.status = "failed"
-            job.completed_at = datetime.now().isoformat()
-            job.error = str(e)
-            self.update_job(job)
+            job = self.fail_job(job_id, str(e))
             
             print(f"Analysis failed: {str(e)}")
         
@@ -165,68 +201,35 @@ class JobManager:
 
     def save_job_data(self, job_id: str, data: dict):
         """Save the analysis data for a job to the database."""
-        # First sanitize the data to handle any non-JSON-compliant values
-        def sanitize_json(obj):
-            if isinstance(obj, dict):
-                return {k: sanitize_json(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [sanitize_json(item) for item in obj]
-            elif isinstance(obj, float) and (math.isinf(obj) or math.isnan(obj)):
-                # Replace infinity and NaN with None (null in JSON)
-                return None
-            else:
-                return obj
-        
-        sanitized_data = sanitize_json(data)
-        
-        # Convert to JSON string
-        data_json = json.dumps(sanitized_data)
-        
-        # Save to database
         with db.get_connection() as conn:
-            # Check if data already exists for this job
-            cursor = conn.execute("SELECT 1 FROM job_data WHERE job_id = ?", (job_id,))
-            exists = cursor.fetchone() is not None
-            
-            if exists:
-                # Update existing record
-                conn.execute("""
-                    UPDATE job_data 
-                    SET analysis_data = ?, created_at = ?
-                    WHERE job_id = ?
-                """, (data_json, datetime.now().isoformat(), job_id))
-            else:
-                # Insert new record
-                conn.execute("""
-                    INSERT INTO job_data (job_id, analysis_data, created_at)
-                    VALUES (?, ?, ?)
-                """, (job_id, data_json, datetime.now().isoformat()))
-            
+            self._write_job_data(conn, job_id, data, datetime.now().isoformat())
             conn.commit()
 
     def save_job_report(self, job_id: str, report_content: str):
         """Save the report content for a job to the database."""
         with db.get_connection() as conn:
-            # Check if report already exists for this job
-            cursor = conn.execute("SELECT 1 FROM job_reports WHERE job_id = ?", (job_id,))
-            exists = cursor.fetchone() is not None
-            
-            if exists:
-                # Update existing record
-                conn.execute("""
-                    UPDATE job_reports 
-                    SET report_content = ?, created_at = ?
-                    WHERE job_id = ?
-                """, (report_content, datetime.now().isoformat(), job_id))
-            else:
-                # Insert new record
-                conn.execute("""
-                    INSERT INTO job_reports (job_id, report_content, created_at)
-                    VALUES (?, ?, ?)
-                """, (job_id, report_content, datetime.now().isoformat()))
-            
+            conn.execute(UPSERT_JOB_REPORT_SQL, (job_id, report_content, datetime.now().isoformat()))
             conn.commit()
 
+    def _write_job_data(self, conn, job_id: str, data: dict, created_at: str):
+        """Upsert a job's analysis data on conn, leaving the commit to the caller."""
+        # orjson writes NaN and +/-Infinity as null, so the data needs no sanitizing pass first
+        data_json = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        # 64-bit fingerprint, signed to fit an SQLite INTEGER
+        data_hash = int.from_bytes(hashlib.blake2b(data_json, digest_size=8).digest(), "big", signed=True)
+        conn.execute(UPSERT_JOB_DATA_SQL, (job_id, data_json, data_hash, created_at))
+
+    def _write_job_report_file(self, conn, job_id: str, report_path: str, created_at: str):
+        """Copy a report file's bytes straight into the job's report BLOB on conn, inside the caller's transaction.
+
+        The file is neither read whole nor decoded: the row is sized with zeroblob() and filled through
+        incremental blob I/O.
+        """
+        size = os.path.getsize(report_path)
+        rowid = conn.execute(UPSERT_JOB_REPORT_BLOB_SQL, (job_id, size, created_at)).fetchone()[0]
+        with open(report_path, "rb") as f, conn.blobopen("job_reports", "report_content", rowid) as blob:
+            shutil.copyfileobj(f, blob, REPORT_COPY_CHUNK_SIZE)
+
     def get_job_data(self, job_id: str):
         """Get the analysis data for a job from the database."""
         with db.get_connection() as conn:
@@ -234,12 +237,22 @@ class JobManager:
             row = cursor.fetchone()
             if not row:
                 return None
-            return json.loads(row['analysis_data'])
+            return orjson.loads(row['analysis_data'])
+
+    def get_job_data_json(self, job_id: str) -> Optional[Union[str, bytes]]:
+        """Get the stored analysis data for a job as JSON text or bytes, without decoding it."""
+        with db.get_connection() as conn:
+            cursor = conn.execute("SELECT analysis_data FROM job_data WHERE job_id = ?", (job_id,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            return row['analysis_data']
 
     def get_job_report(self, job_id: str):
         """Get the report content for a job from the database."""
         with db.get_connection() as conn:
-            cursor = conn.execute("SELECT report_content FROM job_reports WHERE job_id = ?", (job_id,))
+            # Reports saved from files are stored as UTF-8 BLOBs; CAST reads both those and older TEXT rows as str
+            cursor = conn.execute("SELECT CAST(report_content AS TEXT) AS report_content FROM job_reports WHERE job_id = ?", (job_id,))
             row = cursor.fetchone()
             if not row:
                 return None
@@ -1,36 +1,133 @@
 # backend/services/repository_service.py - Enhanced version
 
 import os
+import functools
 from typing import List, Optional, Dict
-import json
 import sqlite3
+import uuid
+import orjson
+import threading
+import time
 from datetime import datetime
 from app.db.database import db
 from app.models.repository import Repository, RepositoryFilter
 
+# How long a find_repositories result may be served from memory
+LIST_CACHE_TTL = 2.0
+# How long a get_repository lookup may be served from memory. Writes made in this process invalidate it at
+# once; the TTL bounds staleness from writes made elsewhere (e.g. analysis worker processes).
+REPOSITORY_CACHE_TTL = 5.0
+
+# Statement text is kept constant so each pooled connection's statement cache reuses the compiled plan.
+# Reads name their columns explicitly; metadata stays in the list projection because clients send the
+# listed repository back unchanged on PUT, and dropping it there would wipe the stored analysis summary.
+REPOSITORY_COLUMNS = ("id, name, path, relative_path, is_favorite, last_accessed, tags, "
+                      "last_commit_date, last_analysis_job_id, metadata")
+SELECT_REPOSITORIES_SQL = f"SELECT {REPOSITORY_COLUMNS} FROM repositories"
+SELECT_REPOSITORY_BY_ID_SQL = f"{SELECT_REPOSITORIES_SQL} WHERE id = ?"
+INSERT_REPOSITORY_SQL = """
+    INSERT INTO repositories (id, name, path, relative_path, is_favorite, last_accessed, tags, 
+                              last_commit_date, last_analysis_job_id, metadata)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+# Saving a path that already exists updates that row in place and keeps its id
+UPSERT_REPOSITORY_SQL = INSERT_REPOSITORY_SQL + """
+    ON CONFLICT(path) DO UPDATE SET
+        name = excluded.name,
+        relative_path = excluded.relative_path,
+        is_favorite = excluded.is_favorite,
+        last_accessed = excluded.last_accessed,
+        tags = excluded.tags,
+        last_commit_date = excluded.last_commit_date,
+        last_analysis_job_id = excluded.last_analysis_job_id,
+        metadata = excluded.metadata
+    RETURNING id
+"""
+UPDATE_REPOSITORY_SQL = """
+    UPDATE repositories 
+    SET name = ?, 
+        path = ?, 
+        relative_path = ?, 
+        is_favorite = ?, 
+        last_accessed = ?, 
+        tags = ?, 
+        last_commit_date = ?, 
+        last_analysis_job_id = ?, 
+        metadata = ?
+    WHERE id = ?
+"""
+UPDATE_REPOSITORY_METADATA_SQL = """
+    UPDATE repositories 
+    SET metadata = ?, last_commit_date = COALESCE(?, last_commit_date)
+    WHERE id = ?
+"""
+# Records a finished analysis without touching the columns users edit; only metadata's analysis_summary key changes
+RECORD_ANALYSIS_SQL = """
+    UPDATE repositories 
+    SET metadata = json_set(COALESCE(metadata, '{}'), '$.analysis_summary', json(?)),
+        last_commit_date = COALESCE(?, last_commit_date),
+        last_analysis_job_id = ?
+    WHERE id = ?
+"""
+
+def _dump_metadata(metadata: Optional[Dict]) -> Optional[str]:
+    """Serialize repository metadata for storage; done before taking a connection so the write holds it briefly."""
+    # Decoded to str so the column keeps holding TEXT that SQLite's JSON functions accept
+    return orjson.dumps(metadata, option=orjson.OPT_NON_STR_KEYS).decode() if metadata else None
+
+@functools.lru_cache(maxsize=64)
+def _build_query(filter_favorite: bool, search_mode: Optional[str], n_tags: int, sort_field: str, sort_dir: str) -> str:
+    """Build the find_repositories SQL for one query shape.
+
+    Filters differ only in their parameters, so each shape maps to one constant statement text that the
+    connection's statement cache keeps compiled.
+    """
+    where_clauses = []
+    if filter_favorite:
+        where_clauses.append("is_favorite = ?")
+    if search_mode == "fts":
+        # Indexed trigram match
+        where_clauses.append("rowid IN (SELECT rowid FROM repositories_fts WHERE repositories_fts MATCH ?)")
+    elif search_mode == "like":
+        where_clauses.append("(name LIKE ? OR path LIKE ? OR tags LIKE ?)")
+    if n_tags:
+        # Any of the tags, ignoring case, looked up through repository_tags' NOCASE index
+        placeholders = ", ".join("?" * n_tags)
+        where_clauses.append(
+            f"rowid IN (SELECT repository_rowid FROM repository_tags WHERE tag COLLATE NOCASE IN ({placeholders}))"
+        )
+    
+    query = SELECT_REPOSITORIES_SQL
+    if where_clauses:
+        query += " WHERE " + " AND ".join(where_clauses)
+    return query + f" ORDER BY {sort_field} {sort_dir}"
+
 class RepositoryService:
     def __init__(self):
         self.db = db
+        # Short-lived cache for list queries; every write bumps the generation, which is part of the key
+        self._list_cache = {}
+        self._list_cache_lock = threading.Lock()
+        self._generation = 0
+        # Per-id rows for get_repository, invalidated by the same generation counter
+        self._repository_cache = {}
+
+    def _invalidate_list_cache(self):
+        """Drop cached list results and repository rows after a write."""
+        with self._list_cache_lock:
+            self._generation += 1
+            self._list_cache.clear()
+            self._repository_cache.clear()
 
     def create_repository(self, repository: Repository) -> Repository:
         """Save a repository to the database. If it already exists (by path), update it."""
+        metadata_json = _dump_metadata(repository.metadata)
         with self.db.get_connection() as conn:
             try:
-                # First check if repository with this path already exists
-                cursor = conn.execute("SELECT id FROM repositories WHERE path = ?", (repository.path,))
-                existing = cursor.fetchone()
-                if existing:
-                    # Update the existing repository
-                    repository.id = existing["id"]
-                    return self.update_repository(existing["id"], repository)
-                    
-                # Otherwise, insert a new repository record.
-                # Remove 'id' from the INSERT; let the DB assign it (assuming it's autoincrement)
-                cursor = conn.execute("""
-                    INSERT INTO repositories (name, path, relative_path, is_favorite, last_accessed, tags, 
-                                              last_commit_date, last_analysis_job_id, metadata)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
+                # New paths are inserted under the model's id (id is TEXT, not autoincrement);
+                # an existing path is updated and its stored id comes back instead
+                cursor = conn.execute(UPSERT_REPOSITORY_SQL, (
+                    repository.id,
                     repository.name,
                     repository.path,
                     repository.relative_path,
@@ -39,33 +136,22 @@ class RepositoryService:
                     repository.tags,
                     repository.last_commit_date,
                     repository.last_analysis_job_id,
-                    json.dumps(repository.metadata) if repository.metadata else None
+                    metadata_json
                 ))
+                repository.id = cursor.fetchone()["id"]
                 conn.commit()
-                # Retrieve and set the generated id.
-                repository.id = cursor.lastrowid
+                self._invalidate_list_cache()
             except sqlite3.IntegrityError:
-                # If we hit an integrity error (e.g., unique constraint), raise a descriptive error.
-                raise ValueError(f"Repository with path '{repository.path}' already exists")
+                # The path conflict is handled by the upsert, so this is the id already belonging to another path
+                raise ValueError(f"Repository with id '{repository.id}' already exists")
         return repository
 
     def update_repository(self, repository_id: int, repository: Repository) -> Repository:
         """Update an existing repository in the database."""
+        metadata_json = _dump_metadata(repository.metadata)
         with self.db.get_connection() as conn:
             try:
-                conn.execute("""
-                    UPDATE repositories 
-                    SET name = ?, 
-                        path = ?, 
-                        relative_path = ?, 
-                        is_favorite = ?, 
-                        last_accessed = ?, 
-                        tags = ?, 
-                        last_commit_date = ?, 
-                        last_analysis_job_id = ?, 
-                        metadata = ?
-                    WHERE id = ?
-                """, (
+                conn.execute(UPDATE_REPOSITORY_SQL, (
                     repository.name,
                     repository.path,
                     repository.relative_path,
@@ -74,44 +160,123 @@ class RepositoryService:
                     repository.tags,
                     repository.last_commit_date,
                     repository.last_analysis_job_id,
-                    json.dumps(repository.metadata) if repository.metadata else None,
+                    metadata_json,
                     repository_id
                 ))
                 conn.commit()
             except sqlite3.Error as e:
                 raise ValueError(f"Failed to update repository: {str(e)}")
+        self._invalidate_list_cache()
         return repository
 
+    def record_analysis(self, repository_id: str, job_id: str, analysis_summary: Dict,
+                        last_commit_date: Optional[str] = None):
+        """Store a finished analysis on a repository: its summary in metadata, the job id and last commit date.
+
+        Other columns and metadata keys are left as they are in the database, so concurrent edits survive.
+        """
+        summary_json = orjson.dumps(analysis_summary).decode()
+        with self.db.get_connection() as conn:
+            cursor = conn.execute(RECORD_ANALYSIS_SQL, (summary_json, last_commit_date, job_id, repository_id))
+            conn.commit()
+        if cursor.rowcount == 0:
+            raise ValueError(f"Repository not found: {repository_id}")
+        self._invalidate_list_cache()
+
+    def get_repository(self, repository_id: str) -> Repository:
+        """Get a repository by ID, serving repeat lookups from a short TTL cache."""
+        with self._list_cache_lock:
+            generation = self._generation
+            cached = self._repository_cache.get(repository_id)
+        if cached and cached[0] > time.monotonic():
+            row = cached[1]
+        else:
+            with self.db.get_connection() as conn:
+                row = conn.execute(SELECT_REPOSITORY_BY_ID_SQL, (repository_id,)).fetchone()
+            if row is None:
+                raise ValueError(f"Repository not found: {repository_id}")
+            with self._list_cache_lock:
+                # A write since the lookup changed the generation, so this row is already stale
+                if generation == self._generation:
+                    if len(self._repository_cache) >= 1024:
+                        self._repository_cache.clear()
+                    self._repository_cache[repository_id] = (time.monotonic() + REPOSITORY_CACHE_TTL, row)
+        # Rows are immutable; callers get a fresh model they are free to modify
+        return Repository.from_db_row(row)
+
     # Advanced filtering to match frontend requirements
     def find_repositories(self, filters: Optional[RepositoryFilter] = None) -> List[Repository]:
         """Find repositories with advanced filtering."""
-        query = "SELECT * FROM repositories"
+        return [Repository.from_db_row(row) for row in self._find_rows(filters)]
+
+    def find_repository_dicts(self, filters: Optional[RepositoryFilter] = None) -> List[Dict]:
+        """Find repositories as plain dicts for read-only list responses, skipping Pydantic validation.
+
+        Stored metadata is already JSON, so it is passed through as an orjson.Fragment instead of being decoded.
+        """
+        return [
+            {
+                "id": str(row["id"]) if row["id"] is not None else str(uuid.uuid4()),
+                "name": row["name"],
+                "path": row["path"],
+                "relative_path": row["relative_path"],
+                "is_favorite": bool(row["is_favorite"]),
+                "last_accessed": row["last_accessed"],
+                "tags": row["tags"],
+                "last_commit_date": row["last_commit_date"],
+                "last_analysis_job_id": row["last_analysis_job_id"],
+                "metadata": orjson.Fragment(row["metadata"]) if row["metadata"] else None
+            }
+            for row in self._find_rows(filters)
+        ]
+
+    def _find_rows(self, filters: Optional[RepositoryFilter] = None) -> List[sqlite3.Row]:
+        """Return matching rows, serving repeat queries from a short TTL cache."""
+        with self._list_cache_lock:
+            key = (self._generation,)
+            if filters:
+                key += (filters.search, filters.is_favorite, tuple(filters.tags) if filters.tags else None,
+                        filters.sort_by, filters.sort_order)
+            cached = self._list_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        rows = self._query_repositories(filters)
+        with self._list_cache_lock:
+            # A write since the lookup changed the generation, so this result is already stale
+            if key[0] == self._generation:
+                if len(self._list_cache) >= 256:
+                    self._list_cache.clear()  # Keep distinct search strings from growing the cache unbounded
+                self._list_cache[key] = (time.monotonic() + LIST_CACHE_TTL, rows)
+        return rows
+
+    def _query_repositories(self, filters: Optional[RepositoryFilter] = None) -> List[sqlite3.Row]:
+        """Run the filtered repository query against the database."""
+        filter_favorite = False
+        search_mode = None
+        n_tags = 0
         params = []
         
         # Apply filters if provided
         if filters:
-            where_clauses = []
-            
             if filters.is_favorite is not None:
-                where_clauses.append("is_favorite = ?")
+                filter_favorite = True
                 params.append(1 if filters.is_favorite else 0)
             
             if filters.search:
-                where_clauses.append("(name LIKE ? OR path LIKE ? OR tags LIKE ?)")
-                search_param = f"%{filters.search}%"
-                params.extend([search_param, search_param, search_param])
+                if self.db.fts_enabled and len(filters.search) >= 3:
+                    search_mode = "fts"
+                    # The term is quoted as a phrase so FTS syntax in it is literal
+                    params.append('"' + filters.search.replace('"', '""') + '"')
+                else:
+                    # Trigrams can't match terms shorter than three characters
+                    search_mode = "like"
+                    search_param = f"%{filters.search}%"
+                    params.extend([search_param, search_param, search_param])
             
             if filters.tags:
-                # Create clauses for each tag
-                tag_clauses = []
-                for tag in filters.tags:
-                    tag_clauses.append("tags LIKE ?")
-                    params.append(f"%{tag}%")
-                if tag_clauses:
-                    where_clauses.append(f"({' OR '.join(tag_clauses)})")
-            
-            if where_clauses:
-                query += " WHERE " + " AND ".join(where_clauses)
+                n_tags = len(filters.tags)
+                params.extend(filters.tags)
         
         # Add sorting
         sort_field = "last_accessed"
@@ -124,40 +289,46 @@ class RepositoryService:
             if filters.sort_order and filters.sort_order.upper() == "ASC":
                 sort_dir = "ASC"
         
-        query += f" ORDER BY {sort_field} {sort_dir}"
-        
+        query = _build_query(filter_favorite, search_mode, n_tags, sort_field, sort_dir)
         with self.db.get_connection() as conn:
             cursor = conn.execute(query, params)
-            return [Repository.from_db_row(row) for row in cursor.fetchall()]
+            return cursor.fetchall()
         
+    def get_all_tags(self) -> List[str]:
+        """Get every distinct repository tag, read from the repository_tags index table."""
+        with self.db.get_connection() as conn:
+            cursor = conn.execute("SELECT DISTINCT tag FROM repository_tags ORDER BY tag")
+            return [row["tag"] for row in cursor.fetchall()]
+
     def update_repositories_metadata(self, repo_updates: List[Dict]) -> int:
-        """Batch update repository metadata (like last commit dates)."""
+        """Batch update repository metadata (like last commit dates) in a single transaction.
+
+        An update that can't be applied is logged and skipped; the rest of the batch still commits.
+        """
+        rows = []
+        for update in repo_updates:
+            if "id" not in update or "metadata" not in update:
+                continue
+            try:
+                metadata_json = orjson.dumps(update["metadata"], option=orjson.OPT_NON_STR_KEYS).decode()
+            except TypeError as e:
+                print(f"Skipping metadata update for repository {update['id']}: {str(e)}")
+                continue
+            rows.append((metadata_json, update.get("last_commit_date"), update["id"]))
+        if not rows:
+            return 0
+
         updated_count = 0
         with self.db.get_connection() as conn:
-            for update in repo_updates:
-                if "id" not in update or "metadata" not in update:
-                    continue
-                    
-                repo_id = update["id"]
-                metadata = update["metadata"]
-                last_commit_date = update.get("last_commit_date")
-                
+            conn.execute("BEGIN")
+            # One statement per row, so a failing row only undoes itself; the compiled statement is reused
+            for row in rows:
                 try:
-                    cursor = conn.execute(
-                        """
-                        UPDATE repositories 
-                        SET metadata = ?, last_commit_date = COALESCE(?, last_commit_date)
-                        WHERE id = ?
-                        """, 
-                        (json.dumps(metadata), last_commit_date, repo_id)
-                    )
-                    if cursor.rowcount > 0:
-                        updated_count += 1
-                except sqlite3.Error:
-                    # Log error but continue with other updates
-                    pass
-                    
+                    updated_count += conn.execute(UPDATE_REPOSITORY_METADATA_SQL, row).rowcount
+                except sqlite3.Error as e:
+                    print(f"Skipping metadata update for repository {row[2]}: {str(e)}")
             conn.commit()
+        self._invalidate_list_cache()
         return updated_count
 
 # Instantiate the enhanced repository service
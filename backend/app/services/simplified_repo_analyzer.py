@@ -6,184 +6,359 @@ Streamlined version of repo_analyzer.py that works with the FastAPI backend.
 
 import os
 import sys
-import re
 import subprocess
+import tempfile
 import datetime
-import json
-from collections import Counter
+from collections import Counter, OrderedDict
+import threading
 import time
 import logging
+import functools
+import hashlib
+import heapq
+import html
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, 
                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def find_git_repos(base_dir, recursive=False):
-    """Find all git repositories in the given directory."""
-    repos = []
+# Read size for streaming git output
+GIT_PIPE_BUFFER_SIZE = 1024 * 1024
+
+# Extensions counted as source files in the code statistics
+SOURCE_EXTENSIONS = frozenset(['.py', '.js', '.java', '.c', '.cpp', '.h', '.cs', '.php', '.rb', '.go', '.ts'])
+
+# HTML report skeleton, filled in with str.format (CSS braces are doubled)
+HTML_REPORT_HEAD = """
+    <html>
+    <head>
+        <title>Repository Analysis Report: {repo_name}</title>
+        <style>
+            body {{ font-family: Arial, sans-serif; margin: 40px; line-height: 1.6; }}
+            h1, h2 {{ color: #333; }}
+            ul {{ list-style-type: none; padding-left: 20px; }}
+            li {{ margin-bottom: 8px; }}
+            .stats {{ display: flex; flex-wrap: wrap; }}
+            .stat-card {{ background: #f5f5f5; border-radius: 5px; padding: 15px; margin: 10px; flex: 1; min-width: 200px; }}
+        </style>
+    </head>
+    <body>
+        <h1>Repository Analysis Report: {repo_name}</h1>
+        
+        <h2>Repository Statistics</h2>
+        <div class="stats">
+            <div class="stat-card">
+                <h3>Basic Info</h3>
+                <ul>
+                    <li><strong>Repository Name:</strong> {repo_name}</li>
+                    <li><strong>Repository Path:</strong> {repo_path}</li>
+                </ul>
+            </div>
+            <div class="stat-card">
+                <h3>Activity</h3>
+                <ul>
+                    <li><strong>Total Commits:</strong> {num_commits}</li>
+                    <li><strong>Total Branches:</strong> {num_branches}</li>
+                    <li><strong>Contributors:</strong> {contributor_count}</li>
+                </ul>
+            </div>
+            <div class="stat-card">
+                <h3>Code Base</h3>
+                <ul>
+                    <li><strong>Total Files:</strong> {file_count}</li>
+                    <li><strong>Total Lines:</strong> {total_lines}</li>
+                </ul>
+            </div>
+        </div>
+        
+        <h2>Recent Commits</h2>
+        <ul>
+    """
+HTML_COMMIT_ITEM = "<li><strong>{date}</strong> - {message} (by {author})</li>\n".format
+HTML_REPORT_TAIL = """
+        </ul>
+    </body>
+    </html>
+    """
+
+# Bump when the layout of cached git data changes so stale cache files are ignored
+GIT_CACHE_VERSION = 5
+
+# Git data of the most recently analyzed repositories, kept in memory per (real path, history cap)
+GIT_DATA_MEMO_SIZE = 8
+_GIT_DATA_MEMO = {}
+_GIT_DATA_MEMO_LOCK = threading.Lock()  # analyze_repositories runs repositories on threads
+
+# Directories find_git_repos never descends into: dependency and cache trees that can be huge but don't
+# hold repositories of their own
+DISCOVERY_SKIP_DIRS = frozenset(['node_modules', '.venv', 'venv', '__pycache__', '.tox', '.mypy_cache'])
+
+# find_git_repos results per (base_dir, recursive, skip_dirs), with the directory mtimes they were read at;
+# least recently used first, and shared by every thread that discovers repositories
+REPO_DISCOVERY_CACHE_SIZE = 32
+_REPO_DISCOVERY_CACHE = OrderedDict()
+_REPO_DISCOVERY_CACHE_LOCK = threading.Lock()
+
+def _dir_mtimes_unchanged(dir_mtimes):
+    """Whether every directory still has the modification time recorded for it."""
+    try:
+        return all(os.stat(path).st_mtime_ns == mtime for path, mtime in dir_mtimes.items())
+    except OSError:
+        return False
+
+def find_git_repos(base_dir, recursive=False, skip_dirs=DISCOVERY_SKIP_DIRS):
+    """Find all git repositories in the given directory, without descending into skip_dirs by name.
+    
+    Results are remembered per (base_dir, recursive, skip_dirs) together with the mtime of every directory read.
+    Adding, removing or renaming anything in a directory changes its mtime, so while none has changed
+    the layout is the same and a stat per directory replaces listing them all again.
+    """
     base_dir = os.path.abspath(base_dir)
-    found_repo_paths = set()
+    key = (base_dir, recursive, frozenset(skip_dirs))
+    with _REPO_DISCOVERY_CACHE_LOCK:
+        cached = _REPO_DISCOVERY_CACHE.get(key)
+        if cached is not None:
+            _REPO_DISCOVERY_CACHE.move_to_end(key)
+    # Checked outside the lock, since it costs a stat per directory
+    if cached is not None and _dir_mtimes_unchanged(cached[0]):
+        return list(cached[1])
     
-    for root, dirs, files in os.walk(base_dir):
-        # Skip .git directories during traversal
-        if ".git" in dirs:
-            dirs.remove(".git")
-            
-        # Check if current directory is a git repository
-        git_dir = os.path.join(root, ".git")
-        if os.path.isdir(git_dir):
-            repo_path = os.path.abspath(root)
-            
-            # Skip if already processed
-            if repo_path in found_repo_paths:
-                continue
-                
-            # Add to found repos
-            found_repo_paths.add(repo_path)
-            
+    repos = []
+    dir_mtimes = {}
+    
+    # Depth-first in os.walk order, reading each directory once: its own listing says whether it is a
+    # repository, so there is no extra stat of <dir>/.git
+    stack = [base_dir]
+    while stack:
+        root = stack.pop()
+        is_repo = False
+        subdirs = []
+        try:
+            # Taken before listing, so a change made while the directory is read invalidates the result
+            dir_mtimes[root] = os.stat(root).st_mtime_ns
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    if entry.name == ".git":
+                        # Skip .git directories during traversal; a .git file (worktree, submodule) isn't a repo
+                        is_repo = is_repo or entry.is_dir()
+                    elif entry.name not in skip_dirs and entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+        except OSError:
+            continue  # Unreadable directory, as os.walk would skip it
+        
+        if is_repo:
             # Create a name that is the relative path from base_dir
-            if repo_path == base_dir:
-                repo_name = os.path.basename(repo_path)
+            if root == base_dir:
+                repo_name = os.path.basename(root)
             else:
-                repo_name = os.path.relpath(repo_path, base_dir)
+                repo_name = os.path.relpath(root, base_dir)
             
-            repos.append((repo_name, repo_path))
+            repos.append((repo_name, root))
             
             # If not recursive, do not look for repos inside this repo
             if not recursive:
-                dirs.clear()
+                continue
+        
+        stack.extend(reversed(subdirs))
+    
+    if dir_mtimes:
+        with _REPO_DISCOVERY_CACHE_LOCK:
+            _REPO_DISCOVERY_CACHE[key] = (dir_mtimes, list(repos))
+            _REPO_DISCOVERY_CACHE.move_to_end(key)
+            if len(_REPO_DISCOVERY_CACHE) > REPO_DISCOVERY_CACHE_SIZE:
+                # Evict the least recently used base directory
+                _REPO_DISCOVERY_CACHE.popitem(last=False)
     
     return repos
 
-def get_commit_history(repo_path):
-    """Extract commit history for a repository."""
-    original_dir = os.getcwd()
+def _read_records(stream, separator, chunk_size=GIT_PIPE_BUFFER_SIZE):
+    """Yield the non-empty separator-terminated records of a text stream as they arrive."""
+    pending = ''
+    for chunk in iter(functools.partial(stream.read, chunk_size), ''):
+        records = (pending + chunk).split(separator)
+        pending = records.pop()
+        yield from filter(None, records)
+    if pending:
+        yield pending
+
+def _read_commit_history(repo_path, max_commits=None, exclude=None, since=None):
+    """get_commit_history without the error handling: a failing git log raises CalledProcessError.
     
-    try:
-        os.chdir(repo_path)
-        
-        cmd = [
-            'git', 'log', '--all', 
-            '--format=%H|%an|%ae|%at|%cn|%ce|%ct|%s'
-        ]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        commits = []
-        
-        for line in result.stdout.strip().split('\n'):
-            if not line:
-                continue
+    Commits reachable from any of the exclude revisions are left out.
+    """
+    # Each record starts with a NUL and holds one line of unit-separated fields, then the commit's
+    # shortstat line if it changed anything; no commit text can contain either separator
+    cmd = [
+        'git', '-C', repo_path, 'log', '--all', '--shortstat', '--root', '--diff-merges=first-parent',
+        '--format=%x00%H%x1f%an%x1f%ae%x1f%at%x1f%cn%x1f%ce%x1f%ct%x1f%s'
+    ]
+    if max_commits:
+        cmd.append(f'--max-count={max_commits}')
+    if since:
+        cmd.append(f'--since={since}')
+    if exclude:
+        # Passed on stdin, which git reads completely before it writes any output
+        cmd.append('--stdin')
+    
+    # Parse the log as git writes it instead of buffering the whole output first
+    commits = []
+    total_lines = 0
+    with subprocess.Popen(cmd, stdin=subprocess.PIPE if exclude else subprocess.DEVNULL,
+                          stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+                          bufsize=GIT_PIPE_BUFFER_SIZE) as proc:
+        if exclude:
+            try:
+                proc.stdin.write(''.join(f'^{rev}\n' for rev in exclude))
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass  # git already exited; its return code says why
+        for record in _read_records(proc.stdout, '\0'):
+            header, _, shortstat = record.partition('\n')
+            head, found, _ = shortstat.partition(' insertion')
+            if found:
+                total_lines += int(head.rpartition(' ')[2])
             
-            parts = line.split('|')
+            # The subject is the last field, so maxsplit stops splitting once it is reached
+            parts = header.split('\x1f', 7)
             if len(parts) < 8:
                 continue
                 
-            commit_hash, author, author_email, author_timestamp, committer, committer_email, committer_timestamp, message = parts[:8]
-            
-            # Convert timestamps to datetime
-            author_date = datetime.datetime.fromtimestamp(int(author_timestamp))
-            commit_date = datetime.datetime.fromtimestamp(int(committer_timestamp))
+            commit_hash, author, author_email, author_timestamp, committer, committer_email, committer_timestamp, message = parts
             
+            # Timestamps stay epoch seconds; datetimes are only built where dates are reported
             commits.append({
                 'hash': commit_hash,
                 'author': author,
                 'author_email': author_email,
-                'author_date': author_date,
+                'author_time': int(author_timestamp),
                 'committer': committer,
                 'committer_email': committer_email,
-                'commit_date': commit_date,
+                'commit_time': int(committer_timestamp),
                 'message': message
             })
-        
-        return commits
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+    
+    return commits, total_lines
+
+def get_commit_history(repo_path, max_commits=None, since=None):
+    """Extract commit history for a repository, or only its max_commits most recent commits.
+    
+    since (any date git log --since accepts, e.g. "1 year ago") also leaves out older commits.
+    
+    Returns (commits, total_lines): the commits plus the lines they added, as counted by get_total_lines,
+    read from the same git log pass.
+    
+    Commits come in git log order: newest first, but a parent is never listed before its children,
+    so commit dates are not strictly descending when branches have skewed clocks.
+    """
+    try:
+        return _read_commit_history(repo_path, max_commits, since=since)
     except subprocess.CalledProcessError as e:
         logger.error(f"Error getting commit history: {e}")
-        return []
-    finally:
-        os.chdir(original_dir)
+        return [], 0
 
 def get_branch_info(repo_path):
     """Get branch information for a repository."""
-    original_dir = os.getcwd()
-    
     try:
-        os.chdir(repo_path)
-        
-        cmd = ['git', 'branch', '-a']
+        # Local branches only, one "<* or space><name>" line each; unlike `git branch -a` this never lists
+        # remote-tracking refs and its output doesn't depend on color or worktree decorations
+        cmd = ['git', '-C', repo_path, 'for-each-ref', '--format=%(HEAD)%(refname:lstrip=2)', 'refs/heads']
         
         result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        branches = []
-        
-        for line in result.stdout.strip().split('\n'):
-            if not line:
-                continue
-            
-            branch = line.strip()
-            is_current = False
-            
-            if branch.startswith('*'):
-                is_current = True
-                branch = branch[1:].strip()
-            
-            # Skip remote branches for simplicity
-            if branch.startswith('remotes/'):
-                continue
-            
-            branches.append({
-                'name': branch,
-                'is_current': is_current
-            })
-        
-        return branches
+        return [
+            {'name': line[1:], 'is_current': line[0] == '*'}
+            for line in result.stdout.splitlines() if line
+        ]
     except subprocess.CalledProcessError as e:
         logger.error(f"Error getting branch info: {e}")
         return []
-    finally:
-        os.chdir(original_dir)
 
-def get_code_stats(repo_path, commits):
-    """Get code statistics for a repository."""
-    original_dir = os.getcwd()
+def _file_extension(name):
+    """os.path.splitext(name)[1] for a bare file name, without the general path handling."""
+    stem, dot, ext = name.rpartition('.')
+    # As with splitext, leading dots (".bashrc") don't start an extension
+    return dot + ext if stem.lstrip('.') else ''
+
+def get_total_lines(repo_path, max_commits=None, since=None):
+    """Get the total number of lines added across all commits (or the max_commits most recent, or those since) of a repository."""
+    total_lines = 0
+    
+    # One git process for every commit. Each commit is diffed against its first parent (merges included)
+    # and root commits against the empty tree; --root makes the latter independent of log.showRoot.
+    cmd = [
+        'git', '-C', repo_path, 'log', '--all', '--shortstat', '--root',
+        '--diff-merges=first-parent', '--pretty=tformat:'
+    ]
+    if max_commits:
+        cmd.append(f'--max-count={max_commits}')
+    if since:
+        cmd.append(f'--since={since}')
     try:
-        os.chdir(repo_path)
+        # Shortstat lines are ASCII (" 3 files changed, 12 insertions(+), 4 deletions(-)"), so they are
+        # scanned as bytes with partition rather than decoded and regex-matched, line by line as git writes them
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                              bufsize=GIT_PIPE_BUFFER_SIZE) as proc:
+            for line in proc.stdout:
+                head, found, _ = line.partition(b' insertion')
+                if found:
+                    total_lines += int(head.rpartition(b' ')[2])
+        if proc.returncode:
+            raise subprocess.CalledProcessError(proc.returncode, cmd)
+    except subprocess.CalledProcessError as e:
+        logger.error(f"Error getting line statistics: {e}")
         total_lines = 0
+    
+    return total_lines
+
+def get_file_extensions(repo_path):
+    """Count the file extensions in the tree of HEAD, from a single git ls-tree call."""
+    cmd = ['git', '-C', repo_path, 'ls-tree', '-r', '-z', '--name-only', 'HEAD']
+    try:
+        result = subprocess.run(cmd, capture_output=True, check=True)
+    except subprocess.CalledProcessError as e:
+        # A repository without commits simply has no files yet
+        if subprocess.run(['git', '-C', repo_path, 'rev-parse', '--verify', '-q', 'HEAD'],
+                          capture_output=True).returncode == 0:
+            logger.error(f"Error listing repository files: {e}")
+        return Counter()
+    
+    # NUL-separated paths are never quoted; names that aren't UTF-8 only need a usable extension
+    paths = result.stdout.decode('utf-8', 'replace').split('\0')
+    file_extensions = Counter(_file_extension(path.rpartition('/')[2]) for path in paths)
+    file_extensions.pop('', None)
+    return file_extensions
+
+def count_commits(repo_path):
+    """Count the commits reachable from any ref without listing them."""
+    cmd = ['git', '-C', repo_path, 'rev-list', '--all', '--count']
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+        return int(result.stdout)
+    except (subprocess.CalledProcessError, ValueError) as e:
+        logger.error(f"Error counting commits: {e}")
+        return None
 
+def get_code_stats(repo_path, commits, total_lines=None, file_extensions=None):
+    """Get code statistics for a repository.
+    
+    total_lines and file_extensions may be passed in when they are already known (e.g. from the git data cache).
+    """
+    try:
         if not commits:
             return {'total_lines': 0, 'file_count': 0}
 
-        # Get the total lines added across all commits
-        for i, commit in enumerate(commits):
-            if i == len(commits) - 1:  # Last commit (earliest chronologically)
-                cmd = ['git', 'diff', '--shortstat', '4b825dc642cb6eb9a060e54bf8d69288fbee4904', commit['hash']]
-            else:
-                cmd = ['git', 'diff', '--shortstat', commit['hash'] + '^', commit['hash']]
-
-            try:
-                result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-                for line in result.stdout.splitlines():
-                    match = re.search(r'(\d+) insertion[s]?', line)
-                    if match:
-                        total_lines += int(match.group(1))
-            except subprocess.CalledProcessError:
-                # Skip if this commit doesn't have a parent
-                pass
+        if total_lines is None:
+            total_lines = get_total_lines(repo_path)
 
-        # Count source files
-        extensions = ['.py', '.js', '.java', '.c', '.cpp', '.h', '.cs', '.php', '.rb', '.go', '.ts']
-        file_count = 0
-        file_extensions = {}
-        
-        for root, _, files in os.walk('.'):
-            if '.git' in root:
-                continue
-                
-            for file in files:
-                _, ext = os.path.splitext(file)
-                if ext:
-                    file_extensions[ext] = file_extensions.get(ext, 0) + 1
-                    if ext in extensions:
-                        file_count += 1
+        # Count source files among those committed at HEAD
+        if file_extensions is None:
+            file_extensions = get_file_extensions(repo_path)
+        file_count = sum(count for ext, count in file_extensions.items() if ext in SOURCE_EXTENSIONS)
         
         return {
             'total_lines': total_lines, 
@@ -193,14 +368,15 @@ def get_code_stats(repo_path, commits):
     except Exception as e:
         logger.error(f"Error processing code stats: {e}")
         return {'total_lines': 0, 'file_count': 0}
-    finally:
-        os.chdir(original_dir)
 
-def calculate_repo_summary(repo_name, commits, branches, code_stats):
-    """Calculate summary statistics for a repository."""
+def calculate_repo_summary(repo_name, commits, branches, code_stats, num_commits=None):
+    """Calculate summary statistics for a repository.
+    
+    num_commits is the size of the full history when commits holds only its most recent part.
+    """
     summary = {
         'name': repo_name,
-        'num_commits': len(commits),
+        'num_commits': len(commits) if num_commits is None else num_commits,
         'num_branches': len(branches),
         'total_lines': code_stats.get('total_lines', 0),
         'file_count': code_stats.get('file_count', 0),
@@ -208,12 +384,22 @@ def calculate_repo_summary(repo_name, commits, branches, code_stats):
     }
     
     if commits:
-        # Sort commits by date
-        sorted_commits = sorted(commits, key=lambda x: x['commit_date'])
+        # Gather every per-commit aggregate in one pass over the history
+        word_counts = Counter()
+        authors = set()
+        first_time = last_time = commits[0]['commit_time']
+        for commit in commits:
+            commit_time = commit['commit_time']
+            if commit_time < first_time:
+                first_time = commit_time
+            elif commit_time > last_time:
+                last_time = commit_time
+            word_counts.update(commit['message'].lower().split())
+            authors.add(commit['author_email'])
         
         # First and last commit dates
-        earliest = sorted_commits[0]['commit_date']
-        latest = sorted_commits[-1]['commit_date']
+        earliest = datetime.datetime.fromtimestamp(first_time)
+        latest = datetime.datetime.fromtimestamp(last_time)
         
         summary['first_commit'] = earliest
         summary['last_commit'] = latest
@@ -223,41 +409,183 @@ def calculate_repo_summary(repo_name, commits, branches, code_stats):
         days = max(1, (latest - earliest).total_seconds() / (24 * 60 * 60))
         summary['commits_per_day'] = len(commits) / days
         
-        # Analyze commit messages
-        messages = [commit['message'] for commit in commits]
-        words = ' '.join(messages).lower().split()
-        word_counts = Counter(words)
-        
+        # Most frequent commit message words
         summary['frequent_words'] = dict(word_counts.most_common(10))
         
         # Calculate active contributors
-        authors = {commit['author_email'] for commit in commits}
         summary['contributor_count'] = len(authors)
     
     return summary
 
-def analyze_repository(repo_path, output_dir):
-    """Analyze a single repository and save results."""
+def _git_state(repo_path):
+    """Read HEAD and every ref, returning (hash of that state, sorted object names the refs point at)."""
+    refs = subprocess.run(
+        ['git', '-C', repo_path, 'for-each-ref', '--format=%(HEAD)%(objectname) %(refname)'],
+        capture_output=True, text=True, check=True
+    ).stdout
+    # Not checked: an unborn HEAD has no commit to resolve
+    head = subprocess.run(
+        ['git', '-C', repo_path, 'rev-parse', '--verify', '-q', 'HEAD'],
+        capture_output=True, text=True
+    ).stdout
+    state = hashlib.sha1(f"{head}\0{refs}".encode()).hexdigest()
+    tips = {line[1:].partition(' ')[0] for line in refs.splitlines() if line}
+    tips.update(head.split())
+    return state, sorted(tips)
+
+def _git_cache_file(cache_dir, memo_key):
+    """The cache file of a repository; each repository (and history cap) keeps only its latest state."""
+    real_path, max_commits = memo_key
+    name = hashlib.sha1(f"{GIT_CACHE_VERSION}\0{real_path}\0{max_commits}".encode())
+    return os.path.join(cache_dir, f"{name.hexdigest()}.json")
+
+def _remember_git_data(memo_key, git_data):
+    """Keep git data in the in-process memo, evicting the least recently stored repository."""
+    with _GIT_DATA_MEMO_LOCK:
+        _GIT_DATA_MEMO.pop(memo_key, None)
+        if len(_GIT_DATA_MEMO) >= GIT_DATA_MEMO_SIZE:
+            del _GIT_DATA_MEMO[next(iter(_GIT_DATA_MEMO))]
+        _GIT_DATA_MEMO[memo_key] = git_data
+
+def _load_git_data(cache_file):
+    """Read cached git data, or None when there is no usable cache file."""
+    try:
+        with open(cache_file, 'rb') as f:
+            return orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+def _save_git_data(cache_file, git_data):
+    """Write git data to the cache, atomically so concurrent readers never see a partial file."""
+    tmp_file = None
+    try:
+        cache_dir = os.path.dirname(cache_file)
+        os.makedirs(cache_dir, exist_ok=True)
+        # A uniquely named temporary file, since threads of one process may cache the same repository at once
+        with tempfile.NamedTemporaryFile(
+            dir=cache_dir, prefix=os.path.basename(cache_file) + '.', suffix='.tmp', delete=False
+        ) as f:
+            tmp_file = f.name
+            f.write(orjson.dumps(git_data))
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        logger.warning(f"Could not write analysis cache {cache_file}: {e}")
+        if tmp_file:
+            try:
+                os.remove(tmp_file)
+            except OSError:
+                pass
+
+def _extend_git_data(repo_path, cached, tips):
+    """Bring cached history up to date by reading only the commits added since, or None if it can't be.
+    
+    Commits are immutable, so when every commit cached is still reachable the history is the cached one
+    plus whatever the old ref tips don't reach. A rewritten or deleted ref shows up as a total count
+    that no longer adds up, and then the history has to be read again in full.
+    """
+    try:
+        new_commits, new_lines = _read_commit_history(repo_path, exclude=cached['tips'])
+    except subprocess.CalledProcessError:
+        return None  # e.g. an old tip was garbage-collected
+    num_commits = len(new_commits) + len(cached['commits'])
+    if count_commits(repo_path) != num_commits:
+        return None
+    # New commits descend from the cached ones, so listing them first keeps children before parents
+    return new_commits + cached['commits'], cached['total_lines'] + new_lines, num_commits
+
+def get_git_data(repo_path, cache_dir=None, max_commits=None, since=None):
+    """Get the commit history, branches, total added lines, commit count and HEAD's file extensions of a repository.
+    
+    These only change when HEAD or a ref moves, so they are kept in memory and, with a cache_dir, on disk
+    along with the ref state: re-analysis of an unchanged repository skips the history walk, and one that
+    only gained commits reads just those (see _extend_git_data). Entries are keyed by the repository's
+    real path, so the same repository reached through a symlink shares them.
+    With max_commits, history and added lines cover only that many of the most recent commits, and with
+    since only the commits after that date; the commit count is still that of the whole history.
+    A since window moves with the clock, so it is never cached.
+    """
+    memo_key = (os.path.realpath(repo_path), max_commits or 0)
+    cache_file = cached = state = tips = None
+    try:
+        if not since:
+            state, tips = _git_state(repo_path)
+    except subprocess.CalledProcessError as e:
+        logger.error(f"Error reading repository refs: {e}")
+    else:
+        cached = _GIT_DATA_MEMO.get(memo_key) if state else None
+        if cache_dir and state:
+            cache_file = _git_cache_file(cache_dir, memo_key)
+            if cached is None or cached['state'] != state:
+                cached = _load_git_data(cache_file) or cached
+        if cached is not None and cached['state'] == state:
+            logger.info("Using cached git history...")
+            _remember_git_data(memo_key, cached)
+            return (
+                cached['commits'], cached['branches'], cached['total_lines'], cached['num_commits'],
+                cached['file_extensions']
+            )
+    
+    # Branches and HEAD's files don't depend on the history, so their git calls run while the log is read
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        logger.info("Getting branch information...")
+        branches_future = pool.submit(get_branch_info, repo_path)
+        logger.info("Listing repository files...")
+        file_extensions_future = pool.submit(get_file_extensions, repo_path)
+        
+        # A capped history is a window onto the newest commits, which can't be extended in place
+        extended = None
+        if cached is not None and not max_commits:
+            logger.info("Getting new commits since the cached history...")
+            extended = _extend_git_data(repo_path, cached, tips)
+        
+        if extended is not None:
+            commits, total_lines, num_commits = extended
+        else:
+            # Get commit history and the lines it added
+            logger.info("Getting commit history...")
+            commits, total_lines = get_commit_history(repo_path, max_commits, since)
+            
+            # Only a windowed history needs a separate count of everything it left out
+            num_commits = len(commits)
+            if since or (max_commits and num_commits >= max_commits):
+                num_commits = count_commits(repo_path) or num_commits
+        
+        branches = branches_future.result()
+        file_extensions = file_extensions_future.result()
+    
+    if state is not None:
+        git_data = {
+            'state': state, 'tips': tips, 'commits': commits, 'branches': branches,
+            'total_lines': total_lines, 'num_commits': num_commits, 'file_extensions': file_extensions
+        }
+        _remember_git_data(memo_key, git_data)
+        if cache_file:
+            _save_git_data(cache_file, git_data)
+    
+    return commits, branches, total_lines, num_commits, file_extensions
+
+def analyze_repository(repo_path, output_dir, cache_dir=None, max_commits=None, since=None):
+    """Analyze a single repository and save results.
+    
+    If cache_dir is given, git history is reused from there while the repository's refs are unchanged.
+    max_commits and since limit the history analyzed to the most recent commits (see get_git_data).
+    """
     os.makedirs(output_dir, exist_ok=True)
     
     repo_name = os.path.basename(repo_path)
     logger.info(f"Analyzing repository: {repo_name}")
     
-    # Get commit history
-    logger.info("Getting commit history...")
-    commits = get_commit_history(repo_path)
-    
-    # Get branch information
-    logger.info("Getting branch information...")
-    branches = get_branch_info(repo_path)
+    commits, branches, total_lines, num_commits, file_extensions = get_git_data(
+        repo_path, cache_dir, max_commits, since
+    )
     
     # Get code statistics
     logger.info("Getting code statistics...")
-    stats = get_code_stats(repo_path, commits)
+    stats = get_code_stats(repo_path, commits, total_lines, file_extensions)
     
     # Calculate summary statistics
     logger.info("Calculating summary statistics...")
-    summary = calculate_repo_summary(repo_name, commits, branches, stats)
+    summary = calculate_repo_summary(repo_name, commits, branches, stats, num_commits)
     
     # Prepare data for serialization
     data = {
@@ -270,8 +598,8 @@ def analyze_repository(repo_path, output_dir):
                 'hash': commit['hash'],
                 'author': commit['author'],
                 'author_email': commit['author_email'],
-                'author_date': commit['author_date'].isoformat(),
-                'commit_date': commit['commit_date'].isoformat(),
+                'author_date': datetime.datetime.fromtimestamp(commit['author_time']).isoformat(),
+                'commit_date': datetime.datetime.fromtimestamp(commit['commit_time']).isoformat(),
                 'message': commit['message']
             }
             for commit in commits
@@ -284,10 +612,14 @@ def analyze_repository(repo_path, output_dir):
         }
     }
     
-    # Save to file
+    # Record the history window, so a partial analysis isn't mistaken for the whole history
+    if max_commits or since:
+        data['history_window'] = {'max_commits': max_commits, 'since': since}
+    
+    # Save to file; compact, since the commit list makes up most of it and it is only read back as data
     data_file = os.path.join(output_dir, "repo_data.json")
-    with open(data_file, 'w') as f:
-        json.dump(data, f, indent=2)
+    with open(data_file, 'wb') as f:
+        f.write(orjson.dumps(data))
     
     return data, data_file
 
@@ -296,122 +628,131 @@ def generate_report(data, output_dir):
     repo_name = data['repository']['name']
     summary = data['summary']
     
-    report = f"# Repository Analysis Report: {repo_name}\n\n"
+    # Collect the report in pieces and write them out in one go instead of re-copying a growing string
+    report = [f"# Repository Analysis Report: {repo_name}\n\n"]
     
     # Basic stats
-    report += "## Repository Statistics\n\n"
-    report += f"- **Repository Name:** {repo_name}\n"
-    report += f"- **Repository Path:** {data['repository']['path']}\n"
-    report += f"- **Total Commits:** {summary['num_commits']}\n"
-    report += f"- **Total Branches:** {summary['num_branches']}\n"
-    report += f"- **Total Files:** {summary['file_count']}\n"
-    report += f"- **Total Lines of Code:** {summary['total_lines']}\n"
+    report.append("## Repository Statistics\n\n")
+    report.append(f"- **Repository Name:** {repo_name}\n")
+    report.append(f"- **Repository Path:** {data['repository']['path']}\n")
+    report.append(f"- **Total Commits:** {summary['num_commits']}\n")
+    report.append(f"- **Total Branches:** {summary['num_branches']}\n")
+    report.append(f"- **Total Files:** {summary['file_count']}\n")
+    report.append(f"- **Total Lines of Code:** {summary['total_lines']}\n")
     
     # Time span
     if 'first_commit' in summary and 'last_commit' in summary:
-        report += f"- **First Commit:** {summary['first_commit']}\n"
-        report += f"- **Last Commit:** {summary['last_commit']}\n"
-        report += f"- **Repository Age:** {summary['time_span_days']} days\n"
+        report.append(f"- **First Commit:** {summary['first_commit']}\n")
+        report.append(f"- **Last Commit:** {summary['last_commit']}\n")
+        report.append(f"- **Repository Age:** {summary['time_span_days']} days\n")
     
     # Contributors
     if 'contributor_count' in summary:
-        report += f"- **Total Contributors:** {summary['contributor_count']}\n"
+        report.append(f"- **Total Contributors:** {summary['contributor_count']}\n")
     
     # Activity metrics
     if 'commits_per_day' in summary:
-        report += f"- **Average Commits Per Day:** {summary['commits_per_day']:.2f}\n"
+        report.append(f"- **Average Commits Per Day:** {summary['commits_per_day']:.2f}\n")
     
     # File extensions
-    report += "\n## File Types\n\n"
+    report.append("\n## File Types\n\n")
     if 'file_extensions' in summary:
-        for ext, count in sorted(summary['file_extensions'].items(), key=lambda x: x[1], reverse=True)[:10]:
-            report += f"- **{ext}:** {count} files\n"
+        report.extend(
+            f"- **{ext}:** {count} files\n"
+            for ext, count in heapq.nlargest(10, summary['file_extensions'].items(), key=lambda x: x[1])
+        )
     
     # Common words in commit messages
-    report += "\n## Common Words in Commit Messages\n\n"
+    report.append("\n## Common Words in Commit Messages\n\n")
     if 'frequent_words' in summary:
-        for word, count in summary['frequent_words'].items():
-            report += f"- **{word}:** {count} occurrences\n"
+        report.extend(f"- **{word}:** {count} occurrences\n" for word, count in summary['frequent_words'].items())
     
     # Recent commits
-    report += "\n## Recent Commits\n\n"
-    recent_commits = sorted(data['commits'], key=lambda x: x['commit_date'], reverse=True)[:10]
-    for commit in recent_commits:
-        date = datetime.datetime.fromisoformat(commit['commit_date']).strftime('%Y-%m-%d %H:%M:%S')
-        report += f"- **{date}** - {commit['message']} (by {commit['author']})\n"
+    report.append("\n## Recent Commits\n\n")
+    # git log lists newest first, but only per line of history, so commits are still ranked by date;
+    # nlargest keeps the ten newest without sorting the whole history
+    # commit_date is ISO 8601, so the display form ('%Y-%m-%d %H:%M:%S') is a slice of it, no parsing needed
+    recent_commits = [
+        (commit['commit_date'][:19].replace('T', ' '), commit)
+        for commit in heapq.nlargest(10, data['commits'], key=lambda x: x['commit_date'])
+    ]
+    report.extend(
+        f"- **{date}** - {commit['message']} (by {commit['author']})\n" for date, commit in recent_commits
+    )
     
     # Save the report
     report_file = os.path.join(output_dir, "repo_analysis_report.md")
     with open(report_file, 'w') as f:
-        f.write(report)
-    
-    # Also create an HTML version
-    html_report = f"""
-    <html>
-    <head>
-        <title>Repository Analysis Report: {repo_name}</title>
-        <style>
-            body {{ font-family: Arial, sans-serif; margin: 40px; line-height: 1.6; }}
-            h1, h2 {{ color: #333; }}
-            ul {{ list-style-type: none; padding-left: 20px; }}
-            li {{ margin-bottom: 8px; }}
-            .stats {{ display: flex; flex-wrap: wrap; }}
-            .stat-card {{ background: #f5f5f5; border-radius: 5px; padding: 15px; margin: 10px; flex: 1; min-width: 200px; }}
-        </style>
-    </head>
-    <body>
-        <h1>Repository Analysis Report: {repo_name}</h1>
-        
-        <h2>Repository Statistics</h2>
-        <div class="stats">
-            <div class="stat-card">
-                <h3>Basic Info</h3>
-                <ul>
-                    <li><strong>Repository Name:</strong> {repo_name}</li>
-                    <li><strong>Repository Path:</strong> {data['repository']['path']}</li>
-                </ul>
-            </div>
-            <div class="stat-card">
-                <h3>Activity</h3>
-                <ul>
-                    <li><strong>Total Commits:</strong> {summary['num_commits']}</li>
-                    <li><strong>Total Branches:</strong> {summary['num_branches']}</li>
-                    <li><strong>Contributors:</strong> {summary.get('contributor_count', 'N/A')}</li>
-                </ul>
-            </div>
-            <div class="stat-card">
-                <h3>Code Base</h3>
-                <ul>
-                    <li><strong>Total Files:</strong> {summary['file_count']}</li>
-                    <li><strong>Total Lines:</strong> {summary['total_lines']}</li>
-                </ul>
-            </div>
-        </div>
-        
-        <h2>Recent Commits</h2>
-        <ul>
-    """
+        f.writelines(report)
     
-    for commit in recent_commits:
-        date = datetime.datetime.fromisoformat(commit['commit_date']).strftime('%Y-%m-%d %H:%M:%S')
-        html_report += f"<li><strong>{date}</strong> - {commit['message']} (by {commit['author']})</li>\n"
-    
-    html_report += """
-        </ul>
-    </body>
-    </html>
-    """
+    # Also create an HTML version, escaping the repository and commit text it embeds
+    html_report = [HTML_REPORT_HEAD.format(
+        repo_name=html.escape(repo_name),
+        repo_path=html.escape(data['repository']['path']),
+        num_commits=summary['num_commits'],
+        num_branches=summary['num_branches'],
+        contributor_count=summary.get('contributor_count', 'N/A'),
+        file_count=summary['file_count'],
+        total_lines=summary['total_lines']
+    )]
+    html_report.extend(
+        HTML_COMMIT_ITEM(date=date, message=html.escape(commit['message']), author=html.escape(commit['author']))
+        for date, commit in recent_commits
+    )
+    html_report.append(HTML_REPORT_TAIL)
     
     html_file = os.path.join(output_dir, "repo_analysis_report.html")
     with open(html_file, 'w') as f:
-        f.write(html_report)
+        f.writelines(html_report)
     
     return {
         'markdown': report_file,
         'html': html_file
     }
 
-def run_analysis(repo_path, output_dir, recursive=True, skip_confirmation=True, job_id=None, repo_id=None):
+def _analyze_one(repo, output_dir, cache_dir=None, max_commits=None, since=None):
+    """Analyze one (repo_name, repo_path) pair and write its reports; returns (repo_name, results)."""
+    repo_name, repo_path = repo
+    logger.info(f"Analyzing repository: {repo_name} at {repo_path}")
+    
+    # Create a directory for this repository's results
+    repo_output_dir = os.path.join(output_dir, repo_name.replace('/', '_'))
+    os.makedirs(repo_output_dir, exist_ok=True)
+    
+    # Analyze and get data
+    data, data_file = analyze_repository(repo_path, repo_output_dir, cache_dir, max_commits, since)
+    
+    # Generate report
+    report_files = generate_report(data, repo_output_dir)
+    
+    return repo_name, {
+        'data': data,
+        'data_file': data_file,
+        'report_files': report_files
+    }
+
+def analyze_repositories(repos, output_dir, max_workers=None, cache_dir=None, max_commits=None, since=None):
+    """Analyze several repositories on a thread pool, yielding (repo_name, results) in input order.
+    
+    Repositories are independent and the work is dominated by waiting on git subprocesses, so threads
+    overlap it without starting processes; this already runs inside an analysis worker process, and a
+    nested process pool there would multiply the process count by the number of concurrent jobs.
+    A single repository is analyzed on the calling thread.
+    """
+    if len(repos) <= 1:
+        for repo in repos:
+            yield _analyze_one(repo, output_dir, cache_dir, max_commits, since)
+        return
+    
+    workers = min(len(repos), max_workers or os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analyze-repo") as executor:
+        analyze_one = functools.partial(
+            _analyze_one, output_dir=output_dir, cache_dir=cache_dir, max_commits=max_commits, since=since
+        )
+        yield from executor.map(analyze_one, repos)
+
+def run_analysis(repo_path, output_dir, recursive=True, skip_confirmation=True, job_id=None, repo_id=None,
+                 max_workers=None, cache_dir=None, max_commits=None, since=None):
     """Main analysis function to be called from the backend service.
     
     Args:
@@ -421,6 +762,10 @@ def run_analysis(repo_path, output_dir, recursive=True, skip_confirmation=True,
         skip_confirmation: Whether to skip user confirmation for multiple repositories
         job_id: The ID of the job in the database (if applicable)
         repo_id: The ID of the repository in the database (if applicable)
+        max_workers: Maximum number of repositories analyzed in parallel (defaults to the CPU count)
+        cache_dir: Directory caching git history between runs, keyed by each repository's refs (optional)
+        max_commits: Analyze only this many of each repository's most recent commits (defaults to all)
+        since: Analyze only commits after this date, in any form git log --since accepts (defaults to all)
         
     Returns:
         A tuple containing (results_dict, error_message)
@@ -445,25 +790,10 @@ def run_analysis(repo_path, output_dir, recursive=True, skip_confirmation=True,
         # Analyze each repository
         results = {}
         
-        for repo_name, repo_path in repos:
-            logger.info(f"Analyzing repository: {repo_name} at {repo_path}")
-            
-            # Create a directory for this repository's results
-            repo_output_dir = os.path.join(output_dir, repo_name.replace('/', '_'))
-            os.makedirs(repo_output_dir, exist_ok=True)
-            
-            # Analyze and get data
-            data, data_file = analyze_repository(repo_path, repo_output_dir)
-            
-            # Generate report
-            report_files = generate_report(data, repo_output_dir)
-            
+        for repo_name, repo_results in analyze_repositories(repos, output_dir, max_workers, cache_dir, max_commits, since):
             # Add to results
-            results[repo_name] = {
-                'data': data,
-                'data_file': data_file,
-                'report_files': report_files
-            }
+            results[repo_name] = repo_results
+            data = repo_results['data']
             
             # If repo_id is provided, this means we're working with a specific repository 
             # from the database and should update its metadata
@@ -501,8 +831,8 @@ def run_analysis(repo_path, output_dir, recursive=True, skip_confirmation=True,
         }
         
         summary_file = os.path.join(output_dir, "analysis_summary.json")
-        with open(summary_file, 'w') as f:
-            json.dump(summary, f, indent=2)
+        with open(summary_file, 'wb') as f:
+            f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
         
         logger.info(f"Analysis complete. Results saved to {output_dir}")
         
@@ -0,0 +1,47 @@
+# backend/tests/support.py
+"""Shared test setup: import this before anything from app so the app uses scratch storage."""
+import os
+import subprocess
+import tempfile
+
+# Settings are read once per process, so every test module shares this directory and database
+TMP_DIR = tempfile.mkdtemp(prefix="repo-analyzer-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{TMP_DIR}/data/database.db"
+os.environ["REPORTS_DIR"] = os.path.join(TMP_DIR, "reports")
+os.environ["ANALYSIS_CACHE_DIR"] = ""
+os.environ["ANALYSIS_WORKERS"] = "1"
+
+_counter = 0
+
+def unique_path(prefix: str) -> str:
+    """A path under TMP_DIR that no other test uses."""
+    global _counter
+    _counter += 1
+    return os.path.join(TMP_DIR, f"{prefix}-{_counter}")
+
+def git(path: str, *args: str, date: str = None) -> str:
+    """Run git in path with a fixed identity (and commit date, if given), returning its output."""
+    env = dict(os.environ)
+    if date:
+        env["GIT_AUTHOR_DATE"] = env["GIT_COMMITTER_DATE"] = date
+    return subprocess.run(
+        ["git", "-C", path, "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        check=True, capture_output=True, text=True, env=env
+    ).stdout
+
+def make_repo(path: str, files=None) -> str:
+    """Create a git repository at path with one commit adding files ({name: content})."""
+    os.makedirs(path)
+    git(path, "init", "-q", "-b", "main")
+    commit_files(path, files or {"README.md": "hello\n"}, "Initial commit", date="2024-01-01T12:00:00")
+    return path
+
+def commit_files(path: str, files, message: str, date: str = None):
+    """Write files ({name: content}) into the repository at path and commit them."""
+    for name, content in files.items():
+        file_path = os.path.join(path, name)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "w") as f:
+            f.write(content)
+    git(path, "add", "--", *files)
+    git(path, "commit", "-q", "-m", message, date=date)
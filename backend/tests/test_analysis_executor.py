@@ -0,0 +1,53 @@
+# backend/tests/test_analysis_executor.py
+import os
+import signal
+import time
+import unittest
+from unittest import mock
+from concurrent.futures.process import BrokenProcessPool
+
+from tests.support import make_repo, unique_path
+
+from fastapi.testclient import TestClient
+from app.api import routes
+
+class AnalysisExecutorTest(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(routes.app)
+        self.repo_path = make_repo(unique_path("repo"))
+
+    def _wait_for_job(self, job_id: str, timeout: float = 60) -> dict:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            job = self.client.get(f"/jobs/{job_id}").json()
+            if job["status"] in ("completed", "failed"):
+                return job
+            time.sleep(0.1)
+        self.fail(f"Job {job_id} did not finish within {timeout}s")
+
+    def test_analyze_recovers_after_worker_is_killed(self):
+        # Kill the only worker while it is busy, which breaks the pool
+        executor = routes.ANALYSIS_EXECUTOR
+        worker_pid = executor.submit(os.getpid).result(timeout=30)
+        busy = executor.submit(time.sleep, 30)
+        os.kill(worker_pid, signal.SIGKILL)
+        self.assertIsInstance(busy.exception(timeout=30), BrokenProcessPool)
+
+        response = self.client.post("/analyze", json={"repo_path": self.repo_path})
+        self.assertEqual(response.status_code, 200)
+        job = self._wait_for_job(response.json()["id"])
+        self.assertEqual(job["status"], "completed", job.get("error"))
+        self.assertIsNot(routes.ANALYSIS_EXECUTOR, executor)
+
+    def test_prestart_starts_every_worker(self):
+        with mock.patch.object(routes, "ANALYSIS_WORKER_COUNT", 3):
+            executor = routes._new_analysis_executor()
+            try:
+                routes._prestart_analysis_workers(executor)
+                # Processes are started by submit itself, before any of the no-ops has run
+                self.assertEqual(len(executor._processes), 3)
+            finally:
+                executor.shutdown()
+
+if __name__ == "__main__":
+    unittest.main()
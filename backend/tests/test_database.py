@@ -0,0 +1,142 @@
+# backend/tests/test_database.py
+import unittest
+
+from tests.support import unique_path
+
+from app.db.database import SCHEMA_VERSION, db
+from app.models.repository import Repository, RepositoryFilter
+from app.services.repository_service import repository_service
+
+def _create(tags=None, name=None) -> Repository:
+    """Save a new repository at a fresh path."""
+    path = unique_path("db-repo")
+    name = name or path.rsplit("/", 1)[1]
+    return repository_service.create_repository(Repository(name=name, path=path, relative_path=name, tags=tags))
+
+def _stored_tags(repository_id: str) -> set:
+    """The tags repository_tags holds for a repository."""
+    with db.get_connection() as conn:
+        rows = conn.execute("""
+            SELECT tag FROM repository_tags
+            WHERE repository_rowid = (SELECT rowid FROM repositories WHERE id = ?)
+        """, (repository_id,)).fetchall()
+    return {row["tag"] for row in rows}
+
+def _delete(repository_id: str):
+    with db.get_connection() as conn:
+        conn.execute("DELETE FROM repositories WHERE id = ?", (repository_id,))
+    repository_service._invalidate_list_cache()
+
+def _ids(filters: RepositoryFilter) -> set:
+    return {repo.id for repo in repository_service.find_repositories(filters)}
+
+class SchemaTest(unittest.TestCase):
+    def test_database_is_migrated_to_current_version(self):
+        with db.get_connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0], SCHEMA_VERSION)
+
+class UpsertTest(unittest.TestCase):
+    def test_saving_an_existing_path_updates_it_in_place(self):
+        repo = _create(tags="one")
+        again = Repository(name="renamed", path=repo.path, relative_path="renamed", tags="two")
+        saved = repository_service.create_repository(again)
+
+        self.assertEqual(saved.id, repo.id)
+        stored = repository_service.get_repository(repo.id)
+        self.assertEqual((stored.name, stored.tags), ("renamed", "two"))
+        self.assertEqual(_stored_tags(repo.id), {"two"})
+
+    def test_reusing_another_repositorys_id_is_rejected(self):
+        repo = _create()
+        clash = Repository(id=repo.id, name="clash", path=unique_path("clash"), relative_path="clash")
+        with self.assertRaises(ValueError):
+            repository_service.create_repository(clash)
+
+class TagTableTest(unittest.TestCase):
+    def test_tags_are_split_trimmed_and_kept_with_control_characters(self):
+        repo = _create(tags='a\tb, spaced ,quote"d,back\\slash,,')
+        self.assertEqual(_stored_tags(repo.id), {"a\tb", "spaced", 'quote"d', "back\\slash"})
+        self.assertTrue({"a\tb", "spaced"} <= set(repository_service.get_all_tags()))
+
+    def test_tags_follow_updates_and_deletes(self):
+        repo = _create(tags="before")
+        repo.tags = "after,also"
+        repository_service.update_repository(repo.id, repo)
+        self.assertEqual(_stored_tags(repo.id), {"after", "also"})
+
+        _delete(repo.id)
+        with db.get_connection() as conn:
+            orphans = conn.execute("""
+                SELECT COUNT(*) FROM repository_tags
+                WHERE repository_rowid NOT IN (SELECT rowid FROM repositories)
+            """).fetchone()[0]
+        self.assertEqual(orphans, 0)
+
+    def test_tag_filter_ignores_case_and_matches_any_tag(self):
+        tag = unique_path("Tag").rsplit("/", 1)[1]
+        first = _create(tags=f"{tag},shared")
+        second = _create(tags=f"other-{tag}")
+        self.assertEqual(_ids(RepositoryFilter(tags=[tag.lower()])), {first.id})
+        self.assertEqual(_ids(RepositoryFilter(tags=[tag.upper(), f"OTHER-{tag}"])), {first.id, second.id})
+
+    def test_tags_and_search_survive_vacuum(self):
+        doomed = _create(tags="vacuum-doomed")
+        kept = _create(tags="vacuum-kept", name="vacuum-kept-repository")
+        _delete(doomed.id)
+        with db.get_connection() as conn:
+            conn.execute("VACUUM")
+
+        self.assertEqual(_ids(RepositoryFilter(tags=["vacuum-kept"])), {kept.id})
+        self.assertEqual(_ids(RepositoryFilter(search="vacuum-kept-repo")), {kept.id})
+
+class SearchTest(unittest.TestCase):
+    def setUp(self):
+        self.marker = unique_path("srch").rsplit("/", 1)[1].replace("-", "")
+        self.repo = _create(tags=f"tag{self.marker}", name=f"name{self.marker}")
+
+    def test_search_matches_name_path_and_tags_by_substring(self):
+        self.assertIn(self.repo.id, _ids(RepositoryFilter(search=f"me{self.marker}")))
+        self.assertIn(self.repo.id, _ids(RepositoryFilter(search=self.repo.path[-8:])))
+        self.assertIn(self.repo.id, _ids(RepositoryFilter(search=f"ag{self.marker}")))
+        self.assertNotIn(self.repo.id, _ids(RepositoryFilter(search=f"{self.marker}zzz")))
+
+    def test_search_follows_renames(self):
+        self.repo.name = f"renamed{self.marker}"
+        repository_service.update_repository(self.repo.id, self.repo)
+        self.assertIn(self.repo.id, _ids(RepositoryFilter(search=f"renamed{self.marker}")))
+        self.assertNotIn(self.repo.id, _ids(RepositoryFilter(search=f"name{self.marker}x")))
+
+    def test_short_and_syntax_heavy_terms_are_literal(self):
+        # Two characters are below the trigram length and go through LIKE instead
+        short = _create(name=f"q{self.marker}")
+        self.assertIn(short.id, _ids(RepositoryFilter(search=f"q{self.marker[0]}")))
+        self.assertEqual(_ids(RepositoryFilter(search='"AND OR* NEAR(')), set())
+
+class BatchMetadataTest(unittest.TestCase):
+    def test_bad_rows_are_skipped_and_the_rest_committed(self):
+        good = _create()
+        updated = repository_service.update_repositories_metadata([
+            {"id": good.id, "metadata": {"k": 1}, "last_commit_date": "2024-01-01T00:00:00"},
+            {"id": {"not": "an id"}, "metadata": {"k": 2}},
+            {"id": "missing", "metadata": {}},
+        ])
+        self.assertEqual(updated, 1)
+        stored = repository_service.get_repository(good.id)
+        self.assertEqual((stored.metadata, stored.last_commit_date), ({"k": 1}, "2024-01-01T00:00:00"))
+
+class RecordAnalysisTest(unittest.TestCase):
+    def test_only_analysis_fields_change(self):
+        repo = _create(tags="keep")
+        repository_service.update_repositories_metadata([{"id": repo.id, "metadata": {"note": "keep"}}])
+        repository_service.record_analysis(repo.id, "job-7", {"num_commits": 7}, "2024-02-02T00:00:00")
+
+        stored = repository_service.get_repository(repo.id)
+        self.assertEqual(stored.tags, "keep")
+        self.assertEqual(stored.metadata, {"note": "keep", "analysis_summary": {"num_commits": 7}})
+        self.assertEqual((stored.last_analysis_job_id, stored.last_commit_date), ("job-7", "2024-02-02T00:00:00"))
+
+        with self.assertRaises(ValueError):
+            repository_service.record_analysis("missing", "job-8", {})
+
+if __name__ == "__main__":
+    unittest.main()
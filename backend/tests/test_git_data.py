@@ -0,0 +1,86 @@
+# backend/tests/test_git_data.py
+import os
+import threading
+import unittest
+
+from tests.support import commit_files, git, make_repo, unique_path
+
+from app.services import simplified_repo_analyzer as analyzer
+
+def _make_history(path: str) -> str:
+    """A repository with a merged branch; every commit date is fixed, so the history is deterministic."""
+    make_repo(path, {"README.md": "hello\n"})
+    commit_files(path, {"src/app.py": "a\nb\nc\n"}, "Fix | pipes, and \u00fcnicode", date="2024-01-02T12:00:00")
+    git(path, "checkout", "-q", "-b", "feature")
+    commit_files(path, {"notes.txt": "x\ny\n"}, "Add notes", date="2024-01-03T12:00:00")
+    git(path, "checkout", "-q", "main")
+    commit_files(path, {"src/lib.py": "z\n"}, "Add lib", date="2024-01-04T12:00:00")
+    git(path, "merge", "-q", "--no-ff", "-m", "Merge feature", "feature", date="2024-01-05T12:00:00")
+    return path
+
+class CommitHistoryTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.repo = _make_history(unique_path("history"))
+
+    def test_parses_every_commit_and_field(self):
+        commits, total_lines = analyzer.get_commit_history(self.repo)
+        self.assertEqual(len(commits), 5)
+        by_message = {commit["message"]: commit for commit in commits}
+        self.assertEqual(set(by_message), {
+            "Initial commit", "Fix | pipes, and \u00fcnicode", "Add notes", "Add lib", "Merge feature"
+        })
+        commit = by_message["Fix | pipes, and \u00fcnicode"]
+        self.assertEqual((commit["author"], commit["author_email"]), ("Test", "test@example.com"))
+        self.assertEqual(commit["hash"], git(self.repo, "rev-parse", "main~1^1").strip())
+        self.assertEqual(commit["commit_time"], int(git(self.repo, "log", "-1", "--format=%ct", commit["hash"])))
+        # Merges count the lines they bring in relative to their first parent
+        self.assertEqual(total_lines, 1 + 3 + 2 + 1 + 2)
+
+    def test_max_commits_and_since_limit_the_walk(self):
+        commits, _ = analyzer.get_commit_history(self.repo, max_commits=2)
+        self.assertEqual([commit["message"] for commit in commits], ["Merge feature", "Add lib"])
+        commits, _ = analyzer.get_commit_history(self.repo, since="2024-01-03T00:00:00")
+        self.assertEqual({commit["message"] for commit in commits}, {"Add notes", "Add lib", "Merge feature"})
+
+    def test_missing_repository_yields_no_history(self):
+        self.assertEqual(analyzer.get_commit_history(unique_path("not-a-repo")), ([], 0))
+
+    def test_git_data_extends_cached_history_with_new_commits(self):
+        repo = _make_history(unique_path("extend"))
+        cache_dir = unique_path("extend-cache")
+        analyzer.get_git_data(repo, cache_dir)
+        commit_files(repo, {"more.txt": "1\n2\n3\n4\n"}, "More", date="2024-01-06T12:00:00")
+        analyzer._GIT_DATA_MEMO.clear()
+
+        commits, branches, total_lines, num_commits, extensions = analyzer.get_git_data(repo, cache_dir)
+        full_commits, full_lines = analyzer.get_commit_history(repo)
+        self.assertEqual(sorted(c["hash"] for c in commits), sorted(c["hash"] for c in full_commits))
+        self.assertEqual((total_lines, num_commits), (full_lines, 6))
+        self.assertEqual(
+            sorted((branch["name"], branch["is_current"]) for branch in branches), [("feature", False), ("main", True)]
+        )
+        self.assertEqual(extensions, {".md": 1, ".py": 2, ".txt": 2})
+
+class GitDataCacheTest(unittest.TestCase):
+    def test_concurrent_saves_of_one_repository_leave_a_whole_file(self):
+        cache_dir = unique_path("git-cache")
+        cache_file = os.path.join(cache_dir, "repo.json")
+        payloads = [{"writer": i, "commits": [{"hash": f"{i:040x}"}] * 2000} for i in range(8)]
+        barrier = threading.Barrier(len(payloads))
+
+        def save(payload):
+            barrier.wait()
+            analyzer._save_git_data(cache_file, payload)
+
+        threads = [threading.Thread(target=save, args=(payload,)) for payload in payloads]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertIn(analyzer._load_git_data(cache_file), payloads)
+        self.assertEqual(os.listdir(cache_dir), ["repo.json"])
+
+if __name__ == "__main__":
+    unittest.main()
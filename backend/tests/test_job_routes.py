@@ -0,0 +1,64 @@
+# backend/tests/test_job_routes.py
+import os
+import time
+import unittest
+
+from tests.support import make_repo, unique_path
+
+from fastapi.testclient import TestClient
+from app.api import routes
+from app.config import settings
+from app.services.job_manager import job_manager
+
+class JobRoutesTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.client = TestClient(routes.app)
+        cls.repo_path = make_repo(unique_path("jobs-repo"))
+        response = cls.client.post("/analyze", json={"repo_path": cls.repo_path})
+        assert response.status_code == 200, response.text
+        cls.job_id = response.json()["id"]
+        deadline = time.monotonic() + 60
+        while job_manager.get_job(cls.job_id).status not in ("completed", "failed"):
+            assert time.monotonic() < deadline, "analysis did not finish"
+            time.sleep(0.1)
+
+    def test_list_jobs(self):
+        response = self.client.get("/jobs")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "application/json")
+        job = next(job for job in response.json() if job["id"] == self.job_id)
+        self.assertEqual(job["status"], "completed")
+        self.assertEqual(job["repo_path"], self.repo_path)
+
+    def test_job_data_from_database(self):
+        response = self.client.get(f"/jobs/{self.job_id}/data")
+        self.assertEqual(response.status_code, 200)
+        data = next(iter(response.json().values()))["data"]
+        self.assertEqual(data["summary"]["num_commits"], 1)
+        self.assertEqual(data["commits"][0]["message"], "Initial commit")
+
+    def test_job_report_from_database(self):
+        response = self.client.get(f"/jobs/{self.job_id}/report")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("# Repository Analysis Report", response.json()["content"])
+
+    def test_job_data_file_fallback_writes_nan_as_null(self):
+        # A job stored before analysis data moved into the database, with a json.dump-style NaN
+        job = job_manager.create_job(self.repo_path)
+        job.status = "completed"
+        job_manager.update_job(job)
+        os.makedirs(os.path.join(settings.REPORTS_DIR, job.id))
+        with open(os.path.join(settings.REPORTS_DIR, job.id, "repo_data.json"), "w") as f:
+            f.write('{"summary": {"commits_per_day": NaN, "num_commits": 2}}')
+
+        response = self.client.get(f"/jobs/{job.id}/data")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"summary": {"commits_per_day": None, "num_commits": 2}})
+
+    def test_data_of_unfinished_job_is_rejected(self):
+        job = job_manager.create_job(self.repo_path)
+        self.assertEqual(self.client.get(f"/jobs/{job.id}/data").status_code, 400)
+
+if __name__ == "__main__":
+    unittest.main()
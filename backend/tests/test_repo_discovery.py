@@ -0,0 +1,40 @@
+# backend/tests/test_repo_discovery.py
+import os
+import unittest
+from unittest import mock
+
+from tests.support import make_repo, unique_path
+
+from app.services import simplified_repo_analyzer as analyzer
+
+class FindGitReposTest(unittest.TestCase):
+    def setUp(self):
+        self.base = unique_path("discover")
+        make_repo(os.path.join(self.base, "alpha"))
+        make_repo(os.path.join(self.base, "group", "beta"))
+        os.makedirs(os.path.join(self.base, "node_modules"))
+        make_repo(os.path.join(self.base, "node_modules", "skipped"))
+
+    def test_finds_repositories_outside_skipped_directories(self):
+        repos = analyzer.find_git_repos(self.base, recursive=True)
+        self.assertEqual(sorted(name for name, _ in repos), ["alpha", os.path.join("group", "beta")])
+
+    def test_new_repository_invalidates_cached_result(self):
+        self.assertEqual(len(analyzer.find_git_repos(self.base, recursive=True)), 2)
+        make_repo(os.path.join(self.base, "gamma"))
+        self.assertEqual(len(analyzer.find_git_repos(self.base, recursive=True)), 3)
+
+    def test_cache_evicts_least_recently_used(self):
+        others = [unique_path("discover-lru") for _ in range(2)]
+        for path in others:
+            make_repo(os.path.join(path, "repo"))
+        with mock.patch.object(analyzer, "REPO_DISCOVERY_CACHE_SIZE", 2), \
+                mock.patch.object(analyzer, "_REPO_DISCOVERY_CACHE", analyzer.OrderedDict()) as cache:
+            analyzer.find_git_repos(self.base)
+            analyzer.find_git_repos(others[0])
+            analyzer.find_git_repos(self.base)  # Now the most recently used
+            analyzer.find_git_repos(others[1])
+            self.assertEqual([key[0] for key in cache], [self.base, others[1]])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+# backend/tests/test_repository_routes.py
+import os
+import unittest
+
+from tests.support import unique_path
+
+from fastapi.testclient import TestClient
+from app.api import routes
+from app.models.repository import Repository
+from app.services.repository_service import repository_service
+
+class RepositoryRoutesTest(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(routes.app)
+        path = unique_path("analyzed")
+        self.name = path.rsplit("/", 1)[1]
+        self.repo = repository_service.create_repository(
+            Repository(name=self.name, path=path, relative_path=self.name, tags="Routes")
+        )
+        # Stored metadata is what the list responses pass through as orjson.Fragment
+        repository_service.record_analysis(self.repo.id, "job-1", {"num_commits": 3}, "2024-01-01T12:00:00")
+
+    def test_list_includes_analyzed_repository_metadata(self):
+        response = self.client.get("/repositories")
+        self.assertEqual(response.status_code, 200)
+        listed = {repo["id"]: repo for repo in response.json()}
+        self.assertEqual(listed[self.repo.id]["metadata"], {"analysis_summary": {"num_commits": 3}})
+        self.assertEqual(listed[self.repo.id]["last_analysis_job_id"], "job-1")
+
+    def test_search_returns_analyzed_repository(self):
+        response = self.client.get("/repositories/search", params={"query": self.name})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([repo["id"] for repo in response.json()], [self.repo.id])
+        self.assertEqual(response.json()[0]["metadata"], {"analysis_summary": {"num_commits": 3}})
+
+class CachedJsonRoutesTest(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(routes.app)
+
+    def _assert_revalidates(self, url, params=None):
+        """The route sends an ETag and answers a matching If-None-Match with an empty 304."""
+        first = self.client.get(url, params=params)
+        self.assertEqual(first.status_code, 200)
+        etag = first.headers["etag"]
+        self.assertIn("max-age", first.headers["cache-control"])
+
+        again = self.client.get(url, params=params, headers={"If-None-Match": etag})
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b"")
+        self.assertEqual(again.headers["etag"], etag)
+
+        stale = self.client.get(url, params=params, headers={"If-None-Match": '"stale"'})
+        self.assertEqual(stale.status_code, 200)
+        return first
+
+    def test_tags_revalidate_until_they_change(self):
+        etag = self._assert_revalidates("/repositories/tags").headers["etag"]
+        repository_service.create_repository(
+            Repository(name="etag", path=unique_path("etag"), relative_path="etag", tags="etag-new-tag")
+        )
+        changed = self.client.get("/repositories/tags", headers={"If-None-Match": etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertIn("etag-new-tag", changed.json())
+
+    def test_browse_directory_revalidates(self):
+        directory = unique_path("browse")
+        os.makedirs(os.path.join(directory, "child"))
+        listing = self._assert_revalidates("/browse_directory", {"directory": directory}).json()
+        self.assertEqual([(entry["name"], entry["type"]) for entry in listing["contents"]], [("child", "directory")])
+
+    def test_browse_missing_directory_is_a_bad_request(self):
+        response = self.client.get("/browse_directory", params={"directory": unique_path("missing")})
+        self.assertEqual(response.status_code, 400)
+
+if __name__ == "__main__":
+    unittest.main()